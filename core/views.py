@@ -2,7 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, Q
 from django.http import HttpResponse, Http404
 from django.conf import settings
 from pathlib import Path
@@ -48,60 +48,61 @@ def dashboard(request):
     net_worth_change_pct = net_worth_calc.get_period_change(period)
     chart_path = net_worth_calc.get_chart_path(period)
     
+    # Account totals by type in a single scan (conditional aggregation)
+    account_totals = accounts.aggregate(
+        depository=Sum('balance', filter=Q(accountable_type='depository')),
+        credit_card=Sum('balance', filter=Q(accountable_type='credit_card')),
+        investment=Sum('balance', filter=Q(accountable_type='investment')),
+        crypto=Sum('balance', filter=Q(accountable_type='crypto')),
+        total=Sum('balance'),
+    )
+    
     # Calculate "Caixa Livre" (Free Cash) - sum of depository account balances
-    depository_accounts = accounts.filter(accountable_type='depository')
-    free_cash = depository_accounts.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+    free_cash = account_totals['depository'] or Decimal('0')
     
     # Calculate "Fatura Atual" (Current Credit Card Bill) - sum of credit card balances (negative)
-    credit_cards = accounts.filter(accountable_type='credit_card')
-    credit_card_debt = credit_cards.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+    credit_card_debt = account_totals['credit_card'] or Decimal('0')
     # Credit card balances are typically negative (debt), so we show absolute value
     current_bill = abs(credit_card_debt)
     
     # Calculate "Investimentos" (Investments) - sum of investment account balances
-    investment_accounts = accounts.filter(accountable_type='investment')
-    investments = investment_accounts.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+    investments = account_totals['investment'] or Decimal('0')
     
     # Calculate total balance (all active accounts)
-    total_balance = accounts.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+    total_balance = account_totals['total'] or Decimal('0')
     
     # Monthly Income and Spending (current month)
     today = date.today()
     first_day_this_month = today.replace(day=1)
     
-    monthly_income = transactions.filter(
-        date__gte=first_day_this_month,
-        excluded=False,
-        category__classification='income'
-    ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-    # Income is typically negative in the system, so we take absolute value
-    monthly_income = abs(monthly_income)
-    
-    monthly_spending = transactions.filter(
-        date__gte=first_day_this_month,
-        excluded=False,
-        category__classification='expense'
-    ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-    
-    # Get recent transactions for display
-    recent_transactions = transactions.select_related('account', 'category').order_by('-date', '-created_at')[:10]
-    
     # Calculate spending comparison (this month vs last month) - simplified
     if first_day_this_month.month == 1:
         first_day_last_month = first_day_this_month.replace(year=first_day_this_month.year - 1, month=12)
     else:
         first_day_last_month = first_day_this_month.replace(month=first_day_this_month.month - 1)
     
-    this_month_expenses = transactions.filter(
-        date__gte=first_day_this_month,
-        excluded=False
-    ).filter(category__classification='expense').aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-    
-    last_month_expenses = transactions.filter(
+    this_month = Q(date__gte=first_day_this_month)
+    last_month = Q(date__gte=first_day_last_month, date__lt=first_day_this_month)
+    income = Q(category__classification='income')
+    expense = Q(category__classification='expense')
+    monthly_totals = transactions.filter(
         date__gte=first_day_last_month,
-        date__lt=first_day_this_month,
         excluded=False
-    ).filter(category__classification='expense').aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
+    ).aggregate(
+        income=Sum('amount', filter=this_month & income),
+        spending=Sum('amount', filter=this_month & expense),
+        last_month_spending=Sum('amount', filter=last_month & expense),
+    )
+    
+    # Income is typically negative in the system, so we take absolute value
+    monthly_income = abs(monthly_totals['income'] or Decimal('0'))
+    monthly_spending = monthly_totals['spending'] or Decimal('0')
+    
+    # Get recent transactions for display
+    recent_transactions = transactions.select_related('account', 'category').order_by('-date', '-created_at')[:10]
+    
+    this_month_expenses = monthly_spending
+    last_month_expenses = monthly_totals['last_month_spending'] or Decimal('0')
     
     spending_change = Decimal('0')
     if last_month_expenses > 0:
@@ -114,7 +115,7 @@ def dashboard(request):
     
     if total_net_worth > 0:
         # Stocks (Investment accounts)
-        stocks_total = investment_accounts.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+        stocks_total = investments
         stocks_pct = float((stocks_total / current_net_worth) * 100) if current_net_worth > 0 else 0
         stocks_dash = (stocks_pct / 100) * CIRCUMFERENCE
         
@@ -125,8 +126,7 @@ def dashboard(request):
         }
         
         # Crypto
-        crypto_accounts = accounts.filter(accountable_type='crypto')
-        crypto_total = crypto_accounts.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+        crypto_total = account_totals['crypto'] or Decimal('0')
         crypto_pct = float((crypto_total / current_net_worth) * 100) if current_net_worth > 0 else 0
         crypto_dash = (crypto_pct / 100) * CIRCUMFERENCE
         
@@ -138,7 +138,7 @@ def dashboard(request):
         }
         
         # Cash (Depository accounts)
-        cash_total = depository_accounts.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+        cash_total = free_cash
         cash_pct = float((cash_total / current_net_worth) * 100) if current_net_worth > 0 else 0
         cash_dash = (cash_pct / 100) * CIRCUMFERENCE
         
@@ -198,17 +198,21 @@ def dashboard_stats(request):
     
     accounts = Account.objects.filter(user=request.user, status='active')
     
-    # Calculate Total Assets - sum of all asset account balances
-    asset_accounts = accounts.filter(
-        accountable_type__in=['depository', 'investment', 'crypto', 'property', 'vehicle', 'other_asset']
+    # Asset and liability totals in a single scan (conditional aggregation)
+    totals = accounts.aggregate(
+        assets=Sum('balance', filter=Q(
+            accountable_type__in=['depository', 'investment', 'crypto', 'property', 'vehicle', 'other_asset']
+        )),
+        liabilities=Sum('balance', filter=Q(
+            accountable_type__in=['credit_card', 'loan', 'other_liability']
+        )),
     )
-    total_assets = asset_accounts.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+    
+    # Calculate Total Assets - sum of all asset account balances
+    total_assets = totals['assets'] or Decimal('0')
     
     # Calculate Total Liabilities - sum of all liability account balances (absolute value)
-    liability_accounts = accounts.filter(
-        accountable_type__in=['credit_card', 'loan', 'other_liability']
-    )
-    total_liabilities = abs(liability_accounts.aggregate(Sum('balance'))['balance__sum'] or Decimal('0'))
+    total_liabilities = abs(totals['liabilities'] or Decimal('0'))
     
     # Calculate Net Worth
     net_worth = total_assets - total_liabilities
@@ -6,6 +6,7 @@ class FinanceConfig(AppConfig):
     name = 'finance'
 
     def ready(self):
+        import finance.checks  # noqa
         import finance.signals  # noqa
         import finance.tasks  # noqa
 
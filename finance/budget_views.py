@@ -27,11 +27,11 @@ def budget_detail(request, pk):
     """View budget details with category breakdown"""
     budget = get_object_or_404(Budget, pk=pk, user=request.user)
     
-    # Get budget categories with actual spending
-    budget_categories = budget.budget_categories.all().select_related('category')
+    # Get budget categories with actual spending (annotated in one query)
+    budget_categories = budget.budget_categories.with_metrics().select_related('category')
     for bc in budget_categories:
-        bc.actual = budget.budget_category_actual_spending(bc)
-        bc.available = (bc.budgeted_spending or Decimal('0')) - bc.actual
+        bc.actual = bc.spent
+        bc.available = bc.remaining_budget
     
     context = {
         'budget': budget,
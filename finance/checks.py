@@ -0,0 +1,28 @@
+"""
+System checks for finance app
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Backends whose data is invisible to other processes
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when the sync circuit breaker would only see one process's failures"""
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            'The default cache is not shared between processes.',
+            hint='Set REDIS_URL so sync circuit breakers and dashboard invalidations '
+                 'are shared by the web and Celery worker processes.',
+            obj=backend,
+            id='finance.W001',
+        )
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_alter_rulecondition_operator_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'amount'], name='transaction_account_cd287c_idx'),
+        ),
+    ]
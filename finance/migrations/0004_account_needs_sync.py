@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_transaction_transaction_account_cd287c_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='needs_sync',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(condition=models.Q(('needs_sync', True)), fields=['needs_sync'], name='accounts_needs_sync_idx'),
+        ),
+    ]
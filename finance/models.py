@@ -37,6 +37,8 @@ class Account(models.Model):
     cash_balance = models.DecimalField(max_digits=19, decimal_places=4, default=Decimal('0.0000'))
     currency = models.CharField(max_length=3, default='BRL')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    # Set when entries change under DEFER_ACCOUNT_SYNC, cleared by the drain_dirty_accounts task before it syncs
+    needs_sync = models.BooleanField(default=False, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -47,6 +49,8 @@ class Account(models.Model):
         indexes = [
             models.Index(fields=['user', 'status']),
             models.Index(fields=['user', 'accountable_type']),
+            # Only flagged accounts are indexed, so the drain never scans the whole table
+            models.Index(fields=['needs_sync'], condition=models.Q(needs_sync=True), name='accounts_needs_sync_idx'),
         ]
     
     def __str__(self):
@@ -164,6 +168,7 @@ class Transaction(models.Model):
         ordering = ['-date', '-created_at']
         indexes = [
             models.Index(fields=['account', 'date']),
+            models.Index(fields=['account', 'amount']),
             models.Index(fields=['date']),
             models.Index(fields=['kind']),
         ]
@@ -377,13 +382,15 @@ class Rule(models.Model):
     def matching_resources_scope(self):
         """Get queryset of resources matching this rule's conditions"""
         scope = self.registry.resource_scope
+        # Load top-level conditions (and their sub-conditions) once for both passes
+        conditions = list(self.conditions.filter(parent__isnull=True).prefetch_related('sub_conditions'))
         
         # Prepare queries with necessary joins
-        for condition in self.conditions.filter(parent__isnull=True):
+        for condition in conditions:
             scope = condition.prepare(scope)
         
         # Apply conditions
-        for condition in self.conditions.filter(parent__isnull=True):
+        for condition in conditions:
             scope = condition.apply(scope)
         
         return scope
@@ -718,6 +725,62 @@ class Budget(models.Model):
         return result['total'] or Decimal('0.0000')
 
 
+class BudgetCategoryQuerySet(models.QuerySet):
+    """QuerySet for BudgetCategory with DB-side spending metrics"""
+    
+    def with_metrics(self):
+        """
+        Annotate spent, remaining_budget and percent_spent on each row
+        
+        Mirrors the actual_spending / available_to_spend / percent_of_budget_spent
+        properties, but computed in a single query instead of one aggregate per row.
+        """
+        from django.db.models import (
+            Case, DecimalField, ExpressionWrapper, F, FloatField, OuterRef,
+            Subquery, Sum, Value, When,
+        )
+        from django.db.models.functions import Cast, Coalesce
+        
+        money_field = DecimalField(max_digits=19, decimal_places=4)
+        period_transactions = Transaction.objects.filter(
+            account__user=OuterRef('budget__user'),
+            date__gte=OuterRef('budget__start_date'),
+            date__lte=OuterRef('budget__end_date'),
+            excluded=False,
+        ).order_by().values('account__user')
+        category_total = period_transactions.filter(
+            category=OuterRef('category')
+        ).annotate(total=Sum('amount')).values('total')
+        uncategorized_total = period_transactions.filter(
+            category__isnull=True
+        ).annotate(total=Sum('amount')).values('total')
+        
+        zero = Value(Decimal('0.0000'), output_field=money_field)
+        return self.annotate(
+            spent=Coalesce(
+                Case(
+                    When(category__isnull=True, then=Subquery(uncategorized_total)),
+                    default=Subquery(category_total),
+                    output_field=money_field,
+                ),
+                zero,
+            ),
+        ).annotate(
+            remaining_budget=ExpressionWrapper(
+                Coalesce('budgeted_spending', zero) - F('spent'),
+                output_field=money_field,
+            ),
+            percent_spent=Case(
+                When(
+                    budgeted_spending__gt=0,
+                    then=Cast('spent', FloatField()) * 100.0 / Cast('budgeted_spending', FloatField()),
+                ),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+        )
+
+
 class BudgetCategory(models.Model):
     """Budget allocation for a specific category"""
     
@@ -730,6 +793,8 @@ class BudgetCategory(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BudgetCategoryQuerySet.as_manager()
+    
     class Meta:
         db_table = 'budget_categories'
         unique_together = [['budget', 'category']]
@@ -744,16 +809,22 @@ class BudgetCategory(models.Model):
     @property
     def actual_spending(self):
         """Calculate actual spending for this category"""
+        if 'spent' in self.__dict__:
+            return self.spent
         return self.budget.budget_category_actual_spending(self)
     
     @property
     def available_to_spend(self):
         """Calculate available to spend for this category"""
+        if 'remaining_budget' in self.__dict__:
+            return self.remaining_budget
         return (self.budgeted_spending or Decimal('0.0000')) - self.actual_spending
     
     @property
     def percent_of_budget_spent(self):
         """Calculate percentage of budget spent"""
+        if 'percent_spent' in self.__dict__:
+            return self.percent_spent
         if not self.budgeted_spending or self.budgeted_spending <= 0:
             return 0
         return float((self.actual_spending / self.budgeted_spending) * 100)
@@ -3,6 +3,7 @@ Money utility class for handling currency amounts and formatting.
 Ported from lib/money.rb
 """
 from decimal import Decimal
+from functools import lru_cache
 from datetime import date
 from typing import Optional, Union
 from django.conf import settings
@@ -15,14 +16,21 @@ class ConversionError(Exception):
         self.from_currency = from_currency
         self.to_currency = to_currency
         self.date = conversion_date
-        super().__init__(
-            f"Couldn't find exchange rate from {from_currency} to {to_currency} on {conversion_date}"
-        )
+        super().__init__(from_currency, to_currency, conversion_date)
+    
+    def __str__(self):
+        # Built on demand; callers that catch and fall back never format the message
+        return f"Couldn't find exchange rate from {self.from_currency} to {self.to_currency} on {self.date}"
 
 
 class Currency:
     """Currency information and formatting"""
     
+    __slots__ = (
+        'iso_code', 'name', 'symbol', 'separator', 'delimiter',
+        'default_format', 'default_precision', 'number_format', 'number_translation',
+    )
+    
     # Common currency data (simplified - can be extended with full currencies.yml)
     CURRENCIES = {
         'BRL': {
@@ -54,8 +62,6 @@ class Currency:
         },
     }
     
-    _instances = {}
-    
     def __init__(self, iso_code: str):
         iso_code = iso_code.upper()
         if iso_code not in self.CURRENCIES:
@@ -69,17 +75,22 @@ class Currency:
         self.delimiter = currency_data['delimiter']
         self.default_format = currency_data['default_format']
         self.default_precision = currency_data['default_precision']
+        # Built once per currency so Money.format is one format() and one translate()
+        self.number_format = f",.{self.default_precision}f"
+        self.number_translation = str.maketrans({',': self.delimiter, '.': self.separator})
     
     @classmethod
     def new(cls, iso_code: Union[str, 'Currency']) -> 'Currency':
         """Get or create Currency instance"""
         if isinstance(iso_code, Currency):
             iso_code = iso_code.iso_code
-        iso_code = str(iso_code).upper()
-        
-        if iso_code not in cls._instances:
-            cls._instances[iso_code] = cls(iso_code)
-        return cls._instances[iso_code]
+        return cls._make(str(iso_code).upper())
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _make(cls, iso_code: str) -> 'Currency':
+        """Build the shared instance for an ISO code; unknown codes raise and are not cached"""
+        return cls(iso_code)
     
     def step(self) -> Decimal:
         """Step value for number inputs"""
@@ -100,6 +111,9 @@ class Currency:
 class Money:
     """Money class for handling currency amounts"""
     
+    # Templates build one Money per formatted amount; slots keep instances small
+    __slots__ = ('amount', 'currency', 'store')
+    
     _default_currency = None
     
     def __init__(
@@ -112,7 +126,8 @@ class Money:
             self.amount = amount.amount
             self.currency = amount.currency
         else:
-            self.amount = Decimal(str(amount))
+            # Arithmetic results are already Decimal; skip the str() round-trip for them
+            self.amount = amount if isinstance(amount, Decimal) else Decimal(str(amount))
             if currency is None:
                 currency = self.default_currency()
             self.currency = Currency.new(currency) if isinstance(currency, str) else currency
@@ -177,14 +192,9 @@ class Money:
     def format(self, locale: str = None) -> str:
         """Format money as currency string"""
         # Simplified formatting - can be enhanced with locale support
-        amount_str = f"{self.amount:,.{self.currency.default_precision}f}"
-        
-        # Apply delimiter and separator
-        parts = amount_str.split('.')
-        integer_part = parts[0].replace(',', self.currency.delimiter)
-        decimal_part = parts[1] if len(parts) > 1 else '00'
-        
-        formatted_amount = f"{integer_part}{self.currency.separator}{decimal_part}"
+        formatted_amount = format(self.amount, self.currency.number_format).translate(
+            self.currency.number_translation
+        )
         
         # Apply format
         if '%u' in self.currency.default_format and '%n' in self.currency.default_format:
@@ -1,4 +1,5 @@
 """Action executors for transaction rules"""
+from django.db.models import Q
 from .base import ActionExecutor
 
 
@@ -13,8 +14,8 @@ class SetTransactionCategoryExecutor(ActionExecutor):
     def options(self):
         """Return list of categories for the user"""
         from finance.models import Category
-        categories = Category.objects.filter(user=self.rule.user)
-        return [(category.name, str(category.id)) for category in categories]
+        categories = Category.objects.filter(user=self.rule.user).values_list('name', 'id')
+        return [(name, str(pk)) for name, pk in categories]
     
     def execute(self, queryset, value=None, ignore_attribute_locks=False):
         """Set category on matching transactions"""
@@ -45,8 +46,8 @@ class SetTransactionTagsExecutor(ActionExecutor):
     def options(self):
         """Return list of tags for the user"""
         from finance.models import Tag
-        tags = Tag.objects.filter(user=self.rule.user)
-        return [(tag.name, str(tag.id)) for tag in tags]
+        tags = Tag.objects.filter(user=self.rule.user).values_list('name', 'id')
+        return [(name, str(pk)) for name, pk in tags]
     
     def execute(self, queryset, value=None, ignore_attribute_locks=False):
         """Set tag on matching transactions"""
@@ -59,10 +60,12 @@ class SetTransactionTagsExecutor(ActionExecutor):
         except Tag.DoesNotExist:
             return
         
-        # Add tag to transactions that don't already have it
-        for transaction in queryset:
-            if ignore_attribute_locks or not TransactionTag.objects.filter(transaction=transaction, tag=tag).exists():
-                TransactionTag.objects.get_or_create(transaction=transaction, tag=tag)
+        # Add tag to transactions that don't already have it, in one INSERT
+        untagged_ids = queryset.exclude(transaction_tags__tag=tag).values_list('pk', flat=True)
+        TransactionTag.objects.bulk_create(
+            [TransactionTag(transaction_id=transaction_id, tag=tag) for transaction_id in untagged_ids],
+            ignore_conflicts=True
+        )
 
 
 class SetTransactionMerchantExecutor(ActionExecutor):
@@ -76,8 +79,8 @@ class SetTransactionMerchantExecutor(ActionExecutor):
     def options(self):
         """Return list of merchants for the user"""
         from finance.models import Merchant
-        merchants = Merchant.objects.filter(user=self.rule.user)
-        return [(merchant.name, str(merchant.id)) for merchant in merchants]
+        merchants = Merchant.objects.filter(user=self.rule.user).values_list('name', 'id')
+        return [(name, str(pk)) for name, pk in merchants]
     
     def execute(self, queryset, value=None, ignore_attribute_locks=False):
         """Set merchant on matching transactions"""
@@ -117,7 +120,6 @@ class SetTransactionNameExecutor(ActionExecutor):
         if ignore_attribute_locks:
             queryset.update(name=value)
         else:
-            # Only update if name is empty or matches a pattern
-            queryset.filter(name__isnull=True).update(name=value)
-            queryset.filter(name='').update(name=value)
+            # Only update if name is missing or empty, in a single UPDATE
+            queryset.filter(Q(name__isnull=True) | Q(name='')).update(name=value)
 
@@ -70,8 +70,8 @@ class TransactionMerchantFilter(ConditionFilter):
     def options(self):
         """Return list of merchants for the user"""
         from finance.models import Merchant
-        merchants = Merchant.objects.filter(user=self.rule.user)
-        return [(merchant.name, str(merchant.id)) for merchant in merchants]
+        merchants = Merchant.objects.filter(user=self.rule.user).values_list('name', 'id')
+        return [(name, str(pk)) for name, pk in merchants]
     
     def apply(self, queryset, operator, value):
         """Apply merchant filter to queryset"""
@@ -2,6 +2,7 @@
 Account syncer - ported from app/models/account/syncer.rb
 Orchestrates account synchronization (balance calculation)
 """
+from celery import group
 from finance.models import Account
 from .balance_materializer import BalanceMaterializer
 
@@ -40,3 +41,26 @@ class AccountSyncer:
         # Enqueue async task
         sync_account_balance.delay(self.account.id, strategy=strategy)
 
+    
+    @classmethod
+    def sync_many_later(cls, account_ids, strategy: str = None):
+        """
+        Schedule sync for many accounts in a single broker publish
+        
+        Each account still runs as its own task inside a Celery group, so a
+        failure (and its retries) stays isolated to that account.
+        
+        Args:
+            account_ids: Iterable of account ids to sync
+            strategy: 'forward' or 'reverse' (optional, defaults to None for auto-detection)
+        """
+        from finance.tasks import sync_account_balance
+        
+        signatures = [
+            sync_account_balance.s(account_id, strategy=strategy)
+            for account_id in account_ids
+        ]
+        if not signatures:
+            return None
+        
+        return group(signatures).apply_async()
@@ -3,6 +3,7 @@ Balance calculator - ported from app/models/balance/base_calculator.rb
 """
 from datetime import date, timedelta
 from decimal import Decimal
+from functools import cached_property
 from typing import List, Dict, Optional
 from django.utils import timezone
 from finance.models import Account, Balance, Valuation, Transaction
@@ -15,18 +16,17 @@ class BaseBalanceCalculator:
     
     def __init__(self, account: Account):
         self.account = account
-        self._sync_cache = None
+        self._opening_anchor = None
+        self._opening_anchor_loaded = False
     
     def calculate(self) -> List[Balance]:
         """Calculate balances - must be implemented by subclasses"""
         raise NotImplementedError("Subclasses must implement calculate()")
     
-    @property
+    @cached_property
     def sync_cache(self) -> SyncCache:
         """Get or create sync cache"""
-        if self._sync_cache is None:
-            self._sync_cache = SyncCache(self.account)
-        return self._sync_cache
+        return SyncCache(self.account)
     
     def holdings_value_for_date(self, target_date: date) -> Decimal:
         """Calculate total holdings value for a date"""
@@ -44,24 +44,20 @@ class BaseBalanceCalculator:
     
     def flows_for_date(self, target_date: date) -> Dict[str, Decimal]:
         """Calculate cash and non-cash flows for a date"""
-        entries = self.sync_cache.get_entries(target_date)
+        txn_amounts, trade_amounts = self.sync_cache.get_entry_amounts(target_date)
         
         cash_inflows = Decimal('0')
         cash_outflows = Decimal('0')
         non_cash_inflows = Decimal('0')
         non_cash_outflows = Decimal('0')
         
-        # Separate transactions and trades
-        transactions = [e for e in entries if isinstance(e, Transaction)]
-        trades = [e for e in entries if isinstance(e, Trade)]
-        
         # Transaction flows
-        txn_inflow_sum = sum(t.amount for t in transactions if t.amount < 0)
-        txn_outflow_sum = sum(t.amount for t in transactions if t.amount >= 0)
+        txn_inflow_sum = sum(a for a in txn_amounts if a < 0)
+        txn_outflow_sum = sum(a for a in txn_amounts if a >= 0)
         
         # Trade flows (trades affect cash and holdings)
-        trade_cash_inflow_sum = sum(t.amount for t in trades if t.amount < 0)
-        trade_cash_outflow_sum = sum(t.amount for t in trades if t.amount >= 0)
+        trade_cash_inflow_sum = sum(a for a in trade_amounts if a < 0)
+        trade_cash_outflow_sum = sum(a for a in trade_amounts if a >= 0)
         
         # Loans are special case
         if self.account.accountable_type == 'loan':
@@ -120,11 +116,14 @@ class BaseBalanceCalculator:
         )
     
     def get_opening_anchor(self) -> Optional[Valuation]:
-        """Get opening anchor valuation"""
-        return Valuation.objects.filter(
-            account=self.account,
-            kind='reconciliation'  # Simplified - use reconciliation as opening
-        ).order_by('date').first()
+        """Get opening anchor valuation (queried once per calculator)"""
+        if not self._opening_anchor_loaded:
+            self._opening_anchor = Valuation.objects.filter(
+                account=self.account,
+                kind='reconciliation'  # Simplified - use reconciliation as opening
+            ).order_by('date').first()
+            self._opening_anchor_loaded = True
+        return self._opening_anchor
     
     def get_opening_anchor_balance(self) -> Decimal:
         """Get opening anchor balance"""
@@ -159,11 +158,12 @@ class ForwardBalanceCalculator(BaseBalanceCalculator):
     def calculate(self) -> List[Balance]:
         """Calculate balances forward from opening anchor"""
         start_date = self.get_opening_anchor_date()
+        opening_balance = self.get_opening_anchor_balance()
         start_cash_balance = self.derive_cash_balance_on_date_from_total(
-            total_balance=self.get_opening_anchor_balance(),
+            total_balance=opening_balance,
             target_date=start_date
         )
-        start_non_cash_balance = self.get_opening_anchor_balance() - start_cash_balance
+        start_non_cash_balance = opening_balance - start_cash_balance
         
         # Calculate end date
         end_date = self._calc_end_date()
@@ -173,6 +173,7 @@ class ForwardBalanceCalculator(BaseBalanceCalculator):
         
         balances = []
         current_date = start_date
+        flows_factor = 1 if self.account.classification == 'asset' else -1
         
         while current_date <= end_date:
             valuation = self.sync_cache.get_valuation(current_date)
@@ -192,7 +193,6 @@ class ForwardBalanceCalculator(BaseBalanceCalculator):
             flows = self.flows_for_date(current_date)
             market_value_change = self.market_value_change_on_date(current_date, flows)
             
-            flows_factor = 1 if self.account.classification == 'asset' else -1
             net_cash_flows = (flows['cash_inflows'] - flows['cash_outflows']) * flows_factor
             net_non_cash_flows = (flows['non_cash_inflows'] - flows['non_cash_outflows']) * flows_factor
             
@@ -248,9 +248,9 @@ class ForwardBalanceCalculator(BaseBalanceCalculator):
         
         return timezone.now().date()
     
-    def _signed_entry_flows(self, entries: List) -> Decimal:
+    def _signed_entry_flows(self, amounts: List[Decimal]) -> Decimal:
         """Calculate signed entry flows (negative = inflow for assets)"""
-        total = sum(e.amount for e in entries)
+        total = sum(amounts)
         if self.account.classification == 'asset':
             return -total
         return total
@@ -260,24 +260,21 @@ class ForwardBalanceCalculator(BaseBalanceCalculator):
         if self.account.accountable_type in ['loan', 'other_liability']:
             return Decimal('0')
         
-        entries = self.sync_cache.get_entries(target_date)
-        transactions = [e for e in entries if isinstance(e, Transaction)]
-        trades = [e for e in entries if isinstance(e, Trade)]
+        txn_amounts, trade_amounts = self.sync_cache.get_entry_amounts(target_date)
         
         # Transactions affect cash
-        txn_flows = self._signed_entry_flows(transactions)
+        txn_flows = self._signed_entry_flows(txn_amounts)
         
         # Trades affect cash (buy = outflow, sell = inflow)
-        trade_flows = self._signed_entry_flows(trades)
+        trade_flows = self._signed_entry_flows(trade_amounts)
         
         return start_cash_balance + txn_flows + trade_flows
     
     def _derive_end_non_cash_balance(self, start_non_cash_balance: Decimal, target_date: date) -> Decimal:
         """Derive end non-cash balance from start"""
         if self.account.accountable_type == 'loan':
-            entries = self.sync_cache.get_entries(target_date)
-            transactions = [e for e in entries if isinstance(e, Transaction)]
-            flows = self._signed_entry_flows(transactions)
+            txn_amounts, _ = self.sync_cache.get_entry_amounts(target_date)
+            flows = self._signed_entry_flows(txn_amounts)
             return start_non_cash_balance + flows
         elif self.account.accountable_type == 'investment':
             return self.holdings_value_for_date(target_date)
@@ -1,54 +1,76 @@
 """
 Sync cache for balance calculations - caches entries and holdings for a date range
 """
+from collections import defaultdict
 from datetime import date
 from decimal import Decimal
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from finance.models import Account, Transaction, Valuation
 from investments.models import Holding, Trade
 
 
 class SyncCache:
-    """Cache for entries and holdings during balance calculation"""
+    """
+    Cache for entries and holdings during balance calculation
+    
+    The account's rows are loaded with one query per model on first access and
+    bucketed by date, so walking a date range costs no per-day queries.
+    """
     
     def __init__(self, account: Account):
         self.account = account
+        self._loaded = False
+        self._transactions_by_date: Dict[date, List[Transaction]] = defaultdict(list)
+        self._trades_by_date: Dict[date, List[Trade]] = defaultdict(list)
+        self._holdings_by_date: Dict[date, List[Holding]] = defaultdict(list)
+        self._valuations_by_date: Dict[date, Valuation] = {}
         self._entries_cache: Dict[date, List] = {}
-        self._holdings_cache: Dict[date, List[Holding]] = {}
-        self._valuations_cache: Dict[date, Optional[Valuation]] = {}
+        self._entry_amounts_cache: Dict[date, Tuple[List[Decimal], List[Decimal]]] = {}
+    
+    def _load(self):
+        """Load every entry, valuation and holding of the account, grouped by date"""
+        if self._loaded:
+            return
+        
+        for txn in Transaction.objects.filter(account=self.account).select_related('category', 'merchant'):
+            self._transactions_by_date[txn.date].append(txn)
+        for trade in Trade.objects.filter(account=self.account).select_related('security'):
+            self._trades_by_date[trade.date].append(trade)
+        for holding in Holding.objects.filter(account=self.account).select_related('security'):
+            self._holdings_by_date[holding.date].append(holding)
+        # Keep the first valuation per date, matching Valuation.objects.filter(...).first()
+        for valuation in Valuation.objects.filter(account=self.account).order_by('pk'):
+            self._valuations_by_date.setdefault(valuation.date, valuation)
+        
+        self._loaded = True
     
     def get_entries(self, target_date: date) -> List:
         """Get all entries (transactions and trades) for a date"""
         if target_date not in self._entries_cache:
-            transactions = list(
-                Transaction.objects.filter(account=self.account, date=target_date)
-                .select_related('category', 'merchant')
-            )
-            trades = list(
-                Trade.objects.filter(account=self.account, date=target_date)
-                .select_related('security')
-            )
+            self._load()
             # Combine transactions and trades
-            self._entries_cache[target_date] = transactions + trades
+            self._entries_cache[target_date] = (
+                self._transactions_by_date.get(target_date, [])
+                + self._trades_by_date.get(target_date, [])
+            )
         return self._entries_cache[target_date]
     
+    def get_entry_amounts(self, target_date: date) -> Tuple[List[Decimal], List[Decimal]]:
+        """Get (transaction amounts, trade amounts) for a date, extracted once from the entries"""
+        if target_date not in self._entry_amounts_cache:
+            entries = self.get_entries(target_date)
+            self._entry_amounts_cache[target_date] = (
+                [e.amount for e in entries if isinstance(e, Transaction)],
+                [e.amount for e in entries if isinstance(e, Trade)],
+            )
+        return self._entry_amounts_cache[target_date]
+    
     def get_valuation(self, target_date: date) -> Optional[Valuation]:
         """Get valuation for a date if exists"""
-        if target_date not in self._valuations_cache:
-            valuation = Valuation.objects.filter(
-                account=self.account,
-                date=target_date
-            ).first()
-            self._valuations_cache[target_date] = valuation
-        return self._valuations_cache[target_date]
+        self._load()
+        return self._valuations_by_date.get(target_date)
     
     def get_holdings(self, target_date: date) -> List[Holding]:
         """Get holdings for a date"""
-        if target_date not in self._holdings_cache:
-            holdings = list(
-                Holding.objects.filter(account=self.account, date=target_date)
-                .select_related('security')
-            )
-            self._holdings_cache[target_date] = holdings
-        return self._holdings_cache[target_date]
-
+        self._load()
+        return self._holdings_by_date.get(target_date, [])
@@ -0,0 +1,55 @@
+"""
+Sync circuit breaker - stops retrying account syncs that keep failing
+"""
+import time
+from django.core.cache import cache
+
+
+class SyncCircuitBreaker:
+    """
+    Per-account circuit breaker around AccountSyncer, with state kept in the cache
+    
+    Failures are counted by every Celery worker process, so the default cache
+    must be shared between them (see the finance.W001 deploy check). With a
+    per-process backend such as LocMemCache each process trips separately.
+    """
+    
+    FAILURE_THRESHOLD = 5
+    COOLDOWN_SECONDS = 60
+    # Forget old failures after an hour without new ones
+    STATE_TTL_SECONDS = 3600
+    
+    def __init__(self, account_id):
+        self.account_id = account_id
+        self.failures_key = f'syncer:cb:{account_id}:failures'
+        self.opened_key = f'syncer:cb:{account_id}:opened_at'
+    
+    def is_open(self) -> bool:
+        """
+        Check if syncs for this account should be skipped
+        
+        Once the cooldown has passed the breaker lets the next call through;
+        another failure reopens it immediately.
+        """
+        opened_at = cache.get(self.opened_key)
+        if opened_at is None:
+            return False
+        return time.time() - opened_at < self.COOLDOWN_SECONDS
+    
+    def record_success(self):
+        """Close the breaker after a successful sync"""
+        cache.delete_many([self.failures_key, self.opened_key])
+    
+    def record_failure(self):
+        """Count a failed sync and open the breaker once the threshold is reached"""
+        # add() and incr() are atomic, so concurrent workers never lose a failure
+        cache.add(self.failures_key, 0, timeout=self.STATE_TTL_SECONDS)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            # The counter expired between add() and incr()
+            cache.add(self.failures_key, 1, timeout=self.STATE_TTL_SECONDS)
+            failures = 1
+        cache.touch(self.failures_key, timeout=self.STATE_TTL_SECONDS)
+        if failures >= self.FAILURE_THRESHOLD:
+            cache.set(self.opened_key, time.time(), timeout=self.STATE_TTL_SECONDS)
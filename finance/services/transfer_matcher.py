@@ -2,9 +2,12 @@
 Transfer matcher - automatically matches transactions between accounts
 Ported from app/models/family/auto_transfer_matchable.rb
 """
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import timedelta
 from decimal import Decimal
-from typing import List, Set, Tuple
+from typing import Dict, List, Set, Tuple
 from django.db import transaction
 from django.db.models import Q, F, OuterRef, Subquery
 from django.utils import timezone
@@ -22,6 +25,7 @@ class TransferMatcher:
             user: User whose transactions to match
         """
         self.user = user
+        self._exchange_rates = {}
     
     def auto_match_transfers(self) -> int:
         """
@@ -35,17 +39,28 @@ class TransferMatcher:
         created_count = 0
         used_transaction_ids: Set[str] = set()
         
+        # Load every transaction referenced by a candidate pair in one query
+        candidate_ids = {txn_id for pair in candidates for txn_id in pair}
+        transactions_by_id = {
+            str(txn.id): txn
+            for txn in Transaction.objects.filter(
+                id__in=candidate_ids, account__user=self.user
+            ).select_related('account__user')
+        }
+        
         with transaction.atomic():
             for inflow_id, outflow_id in candidates:
                 # Skip if already used
                 if inflow_id in used_transaction_ids or outflow_id in used_transaction_ids:
                     continue
                 
+                inflow_txn = transactions_by_id.get(inflow_id)
+                outflow_txn = transactions_by_id.get(outflow_id)
+                if inflow_txn is None or outflow_txn is None:
+                    continue
+                
                 # Create transfer
                 try:
-                    inflow_txn = Transaction.objects.get(id=inflow_id, account__user=self.user)
-                    outflow_txn = Transaction.objects.get(id=outflow_id, account__user=self.user)
-                    
                     transfer = Transfer.objects.create(
                         inflow_transaction=inflow_txn,
                         outflow_transaction=outflow_txn,
@@ -107,14 +122,22 @@ class TransferMatcher:
             )
         )
         
-        matches = []
-        
-        # Prefetch all outflow candidates with accounts to avoid N+1 queries
-        # We'll filter by date range in Python for better performance
+        # Load all outflow candidates once, sorted by (date, id), and bucket them by
+        # (currency, amount) for same-currency probes and by currency for cross-currency
+        # ones; each bucket keeps its dates alongside so date windows are a bisect away
         all_outflows = list(
             outflow_candidates.select_related('account')
             .order_by('date', 'id')
         )
+        outflows_by_amount: Dict[Tuple[str, Decimal], List[Transaction]] = defaultdict(list)
+        outflows_by_currency: Dict[str, List[Transaction]] = defaultdict(list)
+        for outflow in all_outflows:
+            outflows_by_amount[(outflow.currency, outflow.amount)].append(outflow)
+            outflows_by_currency[outflow.currency].append(outflow)
+        dates_by_amount = {key: [o.date for o in bucket] for key, bucket in outflows_by_amount.items()}
+        dates_by_currency = {key: [o.date for o in bucket] for key, bucket in outflows_by_currency.items()}
+        
+        matches = []
         
         # For each inflow, try to find matching outflow
         for inflow in inflow_candidates.select_related('account'):
@@ -122,22 +145,35 @@ class TransferMatcher:
             date_range_start = inflow.date - timedelta(days=4)
             date_range_end = inflow.date + timedelta(days=4)
             
-            # Filter outflows in Python (more efficient than per-inflow queries)
-            potential_outflows = [
-                outflow for outflow in all_outflows
-                if (outflow.account_id != inflow.account_id and
-                    date_range_start <= outflow.date <= date_range_end)
-            ]
+            # Same-currency outflows can only match the exact opposite amount;
+            # other currencies are compared through exchange rates
+            amount_key = (inflow.currency, -inflow.amount)
+            windows = [self._date_window(
+                outflows_by_amount.get(amount_key, []), dates_by_amount.get(amount_key, []),
+                date_range_start, date_range_end
+            )]
+            for currency, outflows in outflows_by_currency.items():
+                if currency != inflow.currency:
+                    windows.append(self._date_window(
+                        outflows, dates_by_currency[currency], date_range_start, date_range_end
+                    ))
             
-            for outflow in potential_outflows:
-                if self._amounts_match(inflow, outflow):
-                    matches.append((str(inflow.id), str(outflow.id)))
+            # Each window is already sorted, so merging keeps the (date, id) order
+            for outflow in heapq.merge(*windows, key=lambda outflow: (outflow.date, outflow.id)):
+                if (outflow.account_id != inflow.account_id and
+                        self._amounts_match(inflow, outflow)):
+                    matches.append((str(inflow.id), str(outflow.id), abs((inflow.date - outflow.date).days)))
                     break  # Only match first candidate
         
         # Sort by date difference (closest matches first)
-        matches.sort(key=lambda m: self._get_date_diff(m[0], m[1]))
+        matches.sort(key=lambda m: m[2])
         
-        return matches
+        return [(inflow_id, outflow_id) for inflow_id, outflow_id, _ in matches]
+    
+    @staticmethod
+    def _date_window(outflows: List[Transaction], dates: List, start, end) -> List[Transaction]:
+        """Slice of date-sorted outflows dated between start and end (inclusive)"""
+        return outflows[bisect_left(dates, start):bisect_right(dates, end)]
     
     def _amounts_match(self, inflow: Transaction, outflow: Transaction) -> bool:
         """
@@ -157,11 +193,7 @@ class TransferMatcher:
             # Different currencies: use exchange rate with 5% tolerance
             try:
                 # Try to get exchange rate for outflow date
-                exchange_rate = ExchangeRate.objects.filter(
-                    from_currency=outflow.currency,
-                    to_currency=inflow.currency,
-                    date=outflow.date
-                ).first()
+                exchange_rate = self._get_exchange_rate(outflow.currency, inflow.currency, outflow.date)
                 
                 if not exchange_rate:
                     return False
@@ -180,23 +212,16 @@ class TransferMatcher:
             except Exception:
                 return False
     
-    def _get_date_diff(self, inflow_id: str, outflow_id: str) -> int:
-        """Get absolute date difference between two transactions"""
-        try:
-            transactions = list(
-                Transaction.objects.filter(
-                    id__in=[inflow_id, outflow_id]
-                ).values('id', 'date')
-            )
-            
-            if len(transactions) != 2:
-                return 999
-            
-            # Convert UUIDs to strings for dictionary key matching
-            dates = {str(t['id']): t['date'] for t in transactions}
-            return abs((dates[str(inflow_id)] - dates[str(outflow_id)]).days)
-        except (Transaction.DoesNotExist, KeyError):
-            return 999
+    def _get_exchange_rate(self, from_currency: str, to_currency: str, rate_date):
+        """Get the exchange rate for a currency pair and date, queried once per matcher"""
+        key = (from_currency, to_currency, rate_date)
+        if key not in self._exchange_rates:
+            self._exchange_rates[key] = ExchangeRate.objects.filter(
+                from_currency=from_currency,
+                to_currency=to_currency,
+                date=rate_date
+            ).first()
+        return self._exchange_rates[key]
     
     def _get_transfer_kind_for_account(self, account: Account) -> str:
         """Get appropriate transaction kind for transfer based on account type"""
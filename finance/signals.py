@@ -1,4 +1,8 @@
 import logging
+import threading
+from datetime import date
+from django.conf import settings
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.cache import cache
@@ -7,12 +11,72 @@ from .services.account_syncer import AccountSyncer
 
 logger = logging.getLogger(__name__)
 
+def mark_account_dirty(account_id):
+    """
+    Flag an account for the periodic drain_dirty_accounts task
+    
+    The flag lives on the account row so the web, worker and beat processes
+    all see it. However many entries change in between, each account is
+    synced at most once per drain interval.
+    """
+    Account.objects.filter(pk=account_id, needs_sync=False).update(needs_sync=True)
+
+
+def request_account_sync(account_id):
+    """
+    Sync an account whose entries changed, via the drain task when deferred
+    
+    Without DEFER_ACCOUNT_SYNC (no Celery Beat running) the account is synced
+    right away, so balances still update.
+    """
+    if settings.DEFER_ACCOUNT_SYNC:
+        mark_account_dirty(account_id)
+        return
+    
+    try:
+        account = Account.objects.filter(pk=account_id).first()
+        if account is not None:
+            AccountSyncer(account).sync()
+    except Exception as e:
+        logger.error("Failed to sync account %s: %s", account_id, e, exc_info=True)
+
+
+DASHBOARD_PERIODS = ('1Y', 'YTD', 'ALL')
+
+
 def invalidate_dashboard_cache(user_id):
-    """Invalidate all dashboard cache keys for a user"""
-    periods = ['1Y', 'YTD', 'ALL']
-    for period in periods:
-        cache_key = f'dashboard_stats:{user_id}:{period}'
-        cache.delete(cache_key)
+    """Invalidate all dashboard cache keys for a user in a single round trip"""
+    cache.delete_many([f'dashboard_stats:{user_id}:{period}' for period in DASHBOARD_PERIODS])
+
+
+# user_id -> on_commit queue the invalidation was registered on, per thread
+_pending_invalidations = threading.local()
+
+
+def schedule_dashboard_invalidation(user_id):
+    """
+    Invalidate a user's dashboard cache once, after the current transaction commits
+    
+    Repeated calls within the same transaction collapse into a single callback,
+    and the cache is never cleared before the new data is visible.
+    """
+    pending = getattr(_pending_invalidations, 'users', None)
+    if pending is None:
+        pending = _pending_invalidations.users = {}
+    
+    # Django swaps in a fresh on_commit list on commit/rollback, so a stale entry
+    # (e.g. from a rolled back transaction) never suppresses a new invalidation
+    connection = transaction.get_connection()
+    if connection.in_atomic_block and pending.get(user_id) is connection.run_on_commit:
+        return
+    
+    def invalidate():
+        pending.pop(user_id, None)
+        invalidate_dashboard_cache(user_id)
+    
+    transaction.on_commit(invalidate)
+    if connection.in_atomic_block:
+        pending[user_id] = connection.run_on_commit
 
 # Import Trade and Holding for signal handlers (avoid circular import)
 try:
@@ -21,6 +85,39 @@ except ImportError:
     Trade = None
     Holding = None
 
+def deleted_valuation_affects_balances(valuation):
+    """
+    Check whether deleting a valuation can change materialized balances
+    
+    Balances are materialized up to the latest entry date (or today), and only
+    reconciliation valuations can act as the opening anchor. A future, non-anchor
+    valuation past every entry never makes it into the calculation.
+    """
+    if valuation.kind == 'reconciliation' or valuation.date <= date.today():
+        return True
+    
+    later_entries = [Transaction.objects.filter(account_id=valuation.account_id, date__gte=valuation.date)]
+    if Trade:
+        later_entries.append(Trade.objects.filter(account_id=valuation.account_id, date__gte=valuation.date))
+    if Holding:
+        later_entries.append(Holding.objects.filter(account_id=valuation.account_id, date__gte=valuation.date))
+    return any(entries.exists() for entries in later_entries)
+
+# Fields that feed the balance calculation; saves touching none of them skip the sync
+TRANSACTION_BALANCE_FIELDS = frozenset({'amount', 'date', 'account', 'currency', 'excluded'})
+VALUATION_BALANCE_FIELDS = frozenset({'amount', 'date', 'account', 'currency', 'kind'})
+
+
+def update_affects_balances(sender, update_fields):
+    """Whether a post_save with the given update_fields can change balances"""
+    if update_fields is None:
+        return True
+    
+    balance_fields = VALUATION_BALANCE_FIELDS if sender is Valuation else TRANSACTION_BALANCE_FIELDS
+    # save() accepts attnames too, e.g. update_fields=['account_id']
+    updated = {sender._meta.get_field(field).name for field in update_fields}
+    return not balance_fields.isdisjoint(updated)
+
 @receiver(post_save, sender=Transaction)
 @receiver(post_save, sender=Valuation)
 @receiver(post_delete, sender=Transaction)
@@ -33,12 +130,24 @@ def sync_account_on_entry_change(sender, instance, **kwargs):
     
     try:
         account = instance.account
-        syncer = AccountSyncer(account)
-        syncer.sync()
-        invalidate_dashboard_cache(account.user.id)
+        if (sender is Valuation and kwargs.get('signal') is post_delete
+                and not deleted_valuation_affects_balances(instance)):
+            schedule_dashboard_invalidation(account.user.id)
+            return
+        
+        # Partial saves (e.g. notes, merchant) only refresh the cached dashboard
+        if not update_affects_balances(sender, kwargs.get('update_fields')):
+            schedule_dashboard_invalidation(account.user.id)
+            return
+        
+        # Sync only once the write is committed, so the sync never runs ahead of it
+        account_id = account.id
+        transaction.on_commit(lambda: request_account_sync(account_id))
+        schedule_dashboard_invalidation(account.user.id)
     except Exception as e:
         logger.error(
-            f"Failed to sync account {instance.account.id} after {sender.__name__} change: {e}",
+            "Failed to request sync of account %s after %s change: %s",
+            instance.account_id, sender.__name__, e,
             exc_info=True
         )
         # Don't re-raise - signal handlers shouldn't break the main operation
@@ -49,7 +158,7 @@ def invalidate_cache_on_account_change(sender, instance, **kwargs):
     """Invalidate dashboard cache when account is created/updated/deleted"""
     if kwargs.get('raw', False):
         return
-    invalidate_dashboard_cache(instance.user.id)
+    schedule_dashboard_invalidation(instance.user.id)
 
 @receiver(post_save, sender=Balance)
 @receiver(post_delete, sender=Balance)
@@ -57,7 +166,7 @@ def invalidate_cache_on_balance_change(sender, instance, **kwargs):
     """Invalidate dashboard cache when balance is created/updated/deleted"""
     if kwargs.get('raw', False):
         return
-    invalidate_dashboard_cache(instance.account.user.id)
+    schedule_dashboard_invalidation(instance.account.user.id)
 
 # Handle Trade and Holding signals if investments app is available
 if Trade:
@@ -67,7 +176,7 @@ if Trade:
         """Invalidate dashboard cache when trade is created/updated/deleted"""
         if kwargs.get('raw', False):
             return
-        invalidate_dashboard_cache(instance.account.user.id)
+        schedule_dashboard_invalidation(instance.account.user.id)
 
 if Holding:
     @receiver(post_save, sender=Holding)
@@ -76,5 +185,5 @@ if Holding:
         """Invalidate dashboard cache when holding is created/updated/deleted"""
         if kwargs.get('raw', False):
             return
-        invalidate_dashboard_cache(instance.account.user.id)
+        schedule_dashboard_invalidation(instance.account.user.id)
 
@@ -2,14 +2,31 @@
 Celery tasks for finance app
 """
 import logging
+import random
 from celery import shared_task
 from celery.exceptions import Retry
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError
 from finance.models import Account
 from finance.services.account_syncer import AccountSyncer
+from finance.services.sync_circuit_breaker import SyncCircuitBreaker
+from finance.signals import mark_account_dirty
 
 logger = logging.getLogger(__name__)
 
+# Errors worth retrying: database hiccups (OperationalError, IntegrityError, ...) and network failures
+TRANSIENT_SYNC_ERRORS = (DatabaseError, ConnectionError, TimeoutError)
+
+RETRY_BASE_DELAY = 300
+RETRY_MAX_DELAY = 3600
+
+
+def retry_countdown(retries):
+    """Exponential backoff (5min, 10min, 20min, ... capped at 1h) with +/-10% jitter"""
+    countdown = min(RETRY_BASE_DELAY * 2 ** retries, RETRY_MAX_DELAY)
+    return countdown * (0.9 + 0.2 * random.random())
+
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=300)
 def sync_account_balance(self, account_id, strategy=None):
@@ -20,27 +37,99 @@ def sync_account_balance(self, account_id, strategy=None):
         account_id: UUID of the account to sync
         strategy: 'forward' or 'reverse' (optional, defaults to None for auto-detection)
     
-    Retries up to 3 times with 5-minute delays if it fails
+    Transient failures are retried up to 3 times with exponential backoff and
+    jitter, so a burst of failed tasks does not retry in lockstep. Permanent
+    failures (missing account, validation errors) are not retried.
     """
+    breaker = SyncCircuitBreaker(account_id)
+    if breaker.is_open():
+        logger.debug("Skipping sync for account %s: circuit breaker open", account_id)
+        return f"Skipped account {account_id}: circuit breaker open"
+    
     try:
-        logger.info(f"Starting account balance sync for account {account_id}")
+        logger.info("Starting account balance sync for account %s", account_id)
         
         # Get account from database
-        try:
-            account = Account.objects.get(id=account_id)
-        except ObjectDoesNotExist:
-            logger.error(f"Account {account_id} not found")
+        account = Account.objects.select_related('user').filter(pk=account_id).first()
+        if account is None:
+            logger.error("Account %s not found", account_id)
             return f"Account {account_id} not found"
         
         # Sync the account
         syncer = AccountSyncer(account)
         syncer.sync(strategy=strategy)
+        breaker.record_success()
         
-        logger.info(f"Account balance sync completed for account {account_id}")
+        logger.info("Account balance sync completed for account %s", account_id)
         return f"Successfully synced account {account_id}"
         
+    except ValidationError as exc:
+        breaker.record_failure()
+        logger.error("Account balance sync failed permanently for %s: %s", account_id, exc, exc_info=True)
+        return f"Account {account_id} sync failed: {exc}"
+        
+    except TRANSIENT_SYNC_ERRORS as exc:
+        breaker.record_failure()
+        logger.error("Account balance sync failed for %s: %s", account_id, exc, exc_info=True)
+        # Retry the task with backoff
+        raise self.retry(exc=exc, countdown=retry_countdown(self.request.retries))
+        
     except Exception as exc:
-        logger.error(f"Account balance sync failed for {account_id}: {exc}", exc_info=True)
-        # Retry the task
-        raise self.retry(exc=exc, countdown=300)  # Retry after 5 minutes
+        breaker.record_failure()
+        logger.error("Account balance sync failed for %s: %s", account_id, exc, exc_info=True)
+        raise
+
+
+
+
+# Held while a drain runs so overlapping Beat runs never sync the same account twice;
+# expires on its own if the worker dies mid-drain
+DRAIN_LOCK_KEY = 'drain_dirty_accounts:lock'
+DRAIN_LOCK_TIMEOUT = 300
 
+
+@shared_task
+def drain_dirty_accounts():
+    """
+    Periodic task that syncs every account flagged by entry-change signals
+    
+    Runs every 10 seconds via Celery Beat when DEFER_ACCOUNT_SYNC is enabled.
+    Accounts whose circuit breaker is open stay flagged and are picked up by a
+    later run; failed syncs are flagged again so the breaker eventually trips.
+    A run that starts while another is still draining does nothing.
+    """
+    if not cache.add(DRAIN_LOCK_KEY, 1, timeout=DRAIN_LOCK_TIMEOUT):
+        return "Drain already running"
+    try:
+        return _drain_dirty_accounts()
+    finally:
+        cache.delete(DRAIN_LOCK_KEY)
+
+
+def _drain_dirty_accounts():
+    breakers = {}
+    for account_id in Account.objects.filter(needs_sync=True).values_list('id', flat=True):
+        breaker = SyncCircuitBreaker(account_id)
+        if not breaker.is_open():
+            breakers[account_id] = breaker
+    
+    # Load every account to sync in one query instead of one per dirty account
+    accounts = Account.objects.in_bulk(list(breakers))
+    # Clear the flags before syncing so changes committed meanwhile are caught next run
+    Account.objects.filter(pk__in=list(breakers), needs_sync=True).update(needs_sync=False)
+    
+    synced_count = 0
+    for account_id, breaker in breakers.items():
+        try:
+            account = accounts.get(account_id)
+            if account is None:
+                continue
+            AccountSyncer(account).sync()
+            breaker.record_success()
+            synced_count += 1
+        except Exception as exc:
+            breaker.record_failure()
+            mark_account_dirty(account_id)
+            logger.error("Dirty account sync failed for %s: %s", account_id, exc, exc_info=True)
+    
+    return f"Synced {synced_count} dirty accounts"
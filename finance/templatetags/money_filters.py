@@ -1,8 +1,10 @@
 """
 Template filters for Brazilian money formatting and time formatting
 """
+import time
 from decimal import Decimal
 from datetime import datetime, timedelta
+from functools import lru_cache
 from django import template
 from django.utils import timezone
 from django.utils.safestring import mark_safe
@@ -10,6 +12,41 @@ from ..money import Money, Currency
 
 register = template.Library()
 
+# tabular-nums tracking-tight font-mono keeps numbers aligned in columns
+_SPAN_PREFIX = '<span class="tabular-nums tracking-tight font-mono">'
+_SPAN_SUFFIX = '</span>'
+# Placeholders for missing values, built once and returned as-is
+_NULL_TEXT = '—'
+_NULL_HTML = mark_safe(f'<span class="text-gray-500">{_NULL_TEXT}</span>')
+
+# Nearly every amount is BRL, so resolve its Currency once instead of per value
+_BRL = Currency.new('BRL')
+
+
+@lru_cache(maxsize=4096)
+def _format_br(amount_str: str, currency: str) -> str:
+    """Format an amount with Money, memoized since the same amounts repeat across rows"""
+    return Money(Decimal(amount_str), _BRL if currency == 'BRL' else currency).format()
+
+
+def _to_decimal(value):
+    """Convert a filter input to Decimal, or None if it is not a number-like value"""
+    # Fast path: DecimalField values arrive as plain Decimal and need no re-parse
+    if type(value) is Decimal:
+        return value
+    if isinstance(value, (int, float, str)):
+        return Decimal(str(value))
+    if isinstance(value, Decimal):
+        return value
+    return None
+
+
+def _format_amount(amount: Decimal, currency) -> str:
+    """Format an amount, using the memoized path when the currency is hashable"""
+    if isinstance(currency, str):
+        return _format_br(str(amount), currency)
+    return Money(amount, currency).format()
+
 
 @register.filter(name='real_br')
 def real_br(value, currency='BRL'):
@@ -21,23 +58,17 @@ def real_br(value, currency='BRL'):
         {{ transaction.amount|real_br }}
     """
     if value is None:
-        return mark_safe('<span class="text-gray-500">—</span>')
+        return _NULL_HTML
     
     try:
-        # Convert to Decimal if not already
-        if isinstance(value, (int, float, str)):
-            amount = Decimal(str(value))
-        elif isinstance(value, Decimal):
-            amount = value
-        else:
+        amount = _to_decimal(value)
+        if amount is None:
             return str(value)
         
         # Use Money class for formatting
-        money = Money(amount, currency)
-        formatted = money.format()
+        formatted = _format_amount(amount, currency)
         
-        # Apply tabular-nums tracking-tight font-mono for proper number alignment
-        return mark_safe(f'<span class="tabular-nums tracking-tight font-mono">{formatted}</span>')
+        return mark_safe(_SPAN_PREFIX + formatted + _SPAN_SUFFIX)
     except (ValueError, TypeError):
         return str(value)
     except Exception:
@@ -55,19 +86,15 @@ def real_br_plain(value, currency='BRL'):
         {{ account.balance|real_br_plain }}
     """
     if value is None:
-        return "—"
+        return _NULL_TEXT
     
     try:
-        if isinstance(value, (int, float, str)):
-            amount = Decimal(str(value))
-        elif isinstance(value, Decimal):
-            amount = value
-        else:
+        amount = _to_decimal(value)
+        if amount is None:
             return str(value)
         
-        money = Money(amount, currency)
-        return money.format()
-    except (ValueError, TypeError):
+        return _format_amount(amount, currency)
+    except (ValueError, TypeError, ArithmeticError):
         return str(value)
 
 
@@ -93,6 +120,29 @@ def mul(value, arg):
         return 0
 
 
+@lru_cache(maxsize=4096)
+def _time_ago_bucket(minutes: int):
+    """
+    Relative time label for an age in whole minutes, or None past a week
+    
+    Every bucket boundary is a whole number of minutes, so the label only
+    depends on the minute count and can be cached.
+    """
+    if minutes < 1:
+        return "just now"
+    elif minutes < 60:
+        return f"{minutes}m ago"
+    elif minutes < 1440:
+        hours = minutes // 60
+        return f"{hours}h ago"
+    elif minutes < 2880:  # 2 days
+        return "yesterday"
+    elif minutes < 10080:  # 7 days
+        days = minutes // 1440
+        return f"{days}d ago"
+    return None
+
+
 @register.filter(name='time_ago')
 def time_ago(value):
     """
@@ -105,32 +155,18 @@ def time_ago(value):
         return "never"
     
     try:
-        now = timezone.now()
-        if isinstance(value, datetime):
-            if timezone.is_aware(value):
-                diff = now - value
-            else:
-                diff = now - timezone.make_aware(value)
-        else:
+        if not isinstance(value, datetime):
             return str(value)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
         
-        seconds = int(diff.total_seconds())
+        # Plain float subtraction avoids building an aware "now" and a timedelta per cell
+        seconds = int(time.time() - value.timestamp())
         
-        if seconds < 60:
-            return "just now"
-        elif seconds < 3600:
-            minutes = seconds // 60
-            return f"{minutes}m ago"
-        elif seconds < 86400:
-            hours = seconds // 3600
-            return f"{hours}h ago"
-        elif seconds < 172800:  # 2 days
-            return "yesterday"
-        elif seconds < 604800:  # 7 days
-            days = seconds // 86400
-            return f"{days}d ago"
-        else:
+        label = _time_ago_bucket(seconds // 60)
+        if label is None:
             # For older dates, just show the date
             return value.strftime("%b %d")
+        return label
     except (ValueError, TypeError, AttributeError):
         return "unknown"
@@ -1,6 +1,7 @@
 """
 Edge cases and error handling tests for finance app
 """
+import unittest
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from decimal import Decimal, InvalidOperation
@@ -17,14 +18,15 @@ User = get_user_model()
 class EdgeCaseTestCase(TestCase):
     """Test edge cases and error handling"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
@@ -48,7 +50,7 @@ class EdgeCaseTestCase(TestCase):
         """Test transaction with very large amount"""
         transaction = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('999999999.99'),
             name='Large Transaction',
             currency='BRL'
@@ -60,7 +62,7 @@ class EdgeCaseTestCase(TestCase):
         """Test transaction with very small amount"""
         transaction = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('0.01'),
             name='Small Transaction',
             currency='BRL'
@@ -80,7 +82,7 @@ class EdgeCaseTestCase(TestCase):
         """Test account sync with future-dated transaction"""
         Transaction.objects.create(
             account=self.account,
-            date=date.today() + timedelta(days=30),
+            date=self.today + timedelta(days=30),
             amount=Decimal('100.00'),
             name='Future Transaction',
             currency='BRL'
@@ -96,7 +98,7 @@ class EdgeCaseTestCase(TestCase):
         """Test account sync with very old transaction"""
         Transaction.objects.create(
             account=self.account,
-            date=date.today() - timedelta(days=365),
+            date=self.today - timedelta(days=365),
             amount=Decimal('50.00'),
             name='Old Transaction',
             currency='BRL'
@@ -121,7 +123,7 @@ class EdgeCaseTestCase(TestCase):
         # Create multiple potential matches
         outflow = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('100.00'),
             name='Transfer Out',
             currency='BRL',
@@ -129,22 +131,24 @@ class EdgeCaseTestCase(TestCase):
         )
         
         # Create multiple inflows
-        inflow1 = Transaction.objects.create(
-            account=account2,
-            date=date.today(),
-            amount=Decimal('-100.00'),
-            name='Transfer In 1',
-            currency='BRL',
-            kind='standard'
-        )
-        inflow2 = Transaction.objects.create(
-            account=account2,
-            date=date.today() + timedelta(days=1),
-            amount=Decimal('-100.00'),
-            name='Transfer In 2',
-            currency='BRL',
-            kind='standard'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=account2,
+                date=self.today,
+                amount=Decimal('-100.00'),
+                name='Transfer In 1',
+                currency='BRL',
+                kind='standard'
+            ),
+            Transaction(
+                account=account2,
+                date=self.today + timedelta(days=1),
+                amount=Decimal('-100.00'),
+                name='Transfer In 2',
+                currency='BRL',
+                kind='standard'
+            ),
+        ])
         
         matcher = TransferMatcher(self.user)
         count = matcher.auto_match_transfers()
@@ -156,8 +160,8 @@ class EdgeCaseTestCase(TestCase):
         """Test budget calculation with no transactions"""
         budget = Budget.objects.create(
             user=self.user,
-            start_date=date.today().replace(day=1),
-            end_date=(date.today().replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1),
+            start_date=self.today.replace(day=1),
+            end_date=(self.today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1),
             currency='BRL',
             budgeted_spending=Decimal('1000.00')
         )
@@ -176,7 +180,7 @@ class EdgeCaseTestCase(TestCase):
         
         # Should exist without transactions
         self.assertIsNotNone(category)
-        self.assertEqual(category.transaction_set.count(), 0)
+        self.assertFalse(category.transaction_set.exists())
     
     def test_rule_with_no_conditions(self):
         """Test rule with no conditions"""
@@ -184,19 +188,19 @@ class EdgeCaseTestCase(TestCase):
             user=self.user,
             name='Rule Without Conditions',
             resource_type='transaction',
-            effective_date=date.today()
+            effective_date=self.today
         )
         
         # Should exist without conditions
         self.assertIsNotNone(rule)
-        self.assertEqual(rule.conditions.count(), 0)
+        self.assertFalse(rule.conditions.exists())
     
     def test_account_with_multiple_currencies(self):
         """Test account handling multiple currencies"""
         # Create transactions in different currencies
         Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('100.00'),
             name='BRL Transaction',
             currency='BRL'
@@ -208,40 +212,44 @@ class EdgeCaseTestCase(TestCase):
     def test_balance_calculation_with_gaps(self):
         """Test balance calculation with date gaps"""
         # Create transactions with gaps
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today() - timedelta(days=10),
-            amount=Decimal('100.00'),
-            name='Transaction 1',
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('50.00'),
-            name='Transaction 2',
-            currency='BRL'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=self.account,
+                date=self.today - timedelta(days=10),
+                amount=Decimal('100.00'),
+                name='Transaction 1',
+                currency='BRL'
+            ),
+            Transaction(
+                account=self.account,
+                date=self.today,
+                amount=Decimal('50.00'),
+                name='Transaction 2',
+                currency='BRL'
+            ),
+        ])
         
         syncer = AccountSyncer(self.account)
         syncer.sync()
         
         # Should fill gaps with daily balances
+        # Counting at most three rows is enough to prove more than two exist
         balances = Balance.objects.filter(account=self.account)
-        self.assertGreater(balances.count(), 2)
+        self.assertEqual(balances[:3].count(), 3)
 
 
 class ErrorHandlingTestCase(TestCase):
     """Test error handling scenarios"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
@@ -267,7 +275,7 @@ class ErrorHandlingTestCase(TestCase):
         # Create transaction with unusual values
         Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('0.00'),  # Zero amount
             name='Zero Transaction',
             currency='BRL'
@@ -278,8 +286,7 @@ class ErrorHandlingTestCase(TestCase):
         syncer.sync()
         self.assertTrue(True)
     
+    @unittest.skip("Transfer matching requires negative amounts but model prevents them")
     def test_transfer_match_with_missing_account(self):
         """Test transfer matching when account is deleted"""
-        # Skip - requires negative amounts which model prevents
-        self.skipTest("Transfer matching requires negative amounts but model prevents them")
 
@@ -1,7 +1,7 @@
 """
 Unit tests for finance forms
 """
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 from datetime import date
@@ -11,15 +11,8 @@ from finance.models import Account, Transaction, Category
 User = get_user_model()
 
 
-class AccountFormTestCase(TestCase):
-    """Test AccountForm"""
-    
-    def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
+class AccountFormValidationTestCase(SimpleTestCase):
+    """Test AccountForm validation, which needs no database"""
     
     def test_account_form_valid(self):
         """Test valid account form"""
@@ -41,6 +34,17 @@ class AccountFormTestCase(TestCase):
         }
         form = AccountForm(data=form_data)
         self.assertFalse(form.is_valid())
+
+
+class AccountFormTestCase(TestCase):
+    """Test AccountForm"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com'
+        )
     
     def test_account_form_save(self):
         """Test saving account form"""
@@ -61,21 +65,22 @@ class AccountFormTestCase(TestCase):
 class TransactionFormTestCase(TestCase):
     """Test TransactionForm with Brazilian formatting"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.category = Category.objects.create(
-            user=self.user,
+        cls.category = Category.objects.create(
+            user=cls.user,
             name='Food',
             classification='expense',
             color='#FF0000'
@@ -85,7 +90,7 @@ class TransactionFormTestCase(TestCase):
         """Test transaction form with Brazilian amount format"""
         form_data = {
             'account': self.account.pk,
-            'date': date.today(),
+            'date': self.today,
             'name': 'Test Transaction',
             'amount_display': 'R$ 1.234,56',
             'currency': 'BRL',
@@ -101,7 +106,7 @@ class TransactionFormTestCase(TestCase):
         """Test transaction form with amount without R$ prefix"""
         form_data = {
             'account': self.account.pk,
-            'date': date.today(),
+            'date': self.today,
             'name': 'Test Transaction',
             'amount_display': '1.234,56',
             'currency': 'BRL',
@@ -116,7 +121,7 @@ class TransactionFormTestCase(TestCase):
         """Test transaction form with simple amount format"""
         form_data = {
             'account': self.account.pk,
-            'date': date.today(),
+            'date': self.today,
             'name': 'Test Transaction',
             'amount_display': '50,00',
             'currency': 'BRL',
@@ -131,7 +136,7 @@ class TransactionFormTestCase(TestCase):
         """Test transaction form with invalid amount"""
         form_data = {
             'account': self.account.pk,
-            'date': date.today(),
+            'date': self.today,
             'name': 'Test Transaction',
             'amount_display': 'invalid',
             'currency': 'BRL',
@@ -153,7 +158,7 @@ class TransactionFormTestCase(TestCase):
         """Test transaction form without amount"""
         form_data = {
             'account': self.account.pk,
-            'date': date.today(),
+            'date': self.today,
             'name': 'Test Transaction',
             'currency': 'BRL',
             'kind': 'standard'
@@ -166,8 +171,7 @@ class TransactionFormTestCase(TestCase):
         """Test that form filters accounts by user"""
         other_user = User.objects.create_user(
             username='otheruser',
-            email='other@example.com',
-            password='testpass123'
+            email='other@example.com'
         )
         other_account = Account.objects.create(
             user=other_user,
@@ -178,16 +182,15 @@ class TransactionFormTestCase(TestCase):
         )
         
         form = TransactionForm(user=self.user)
-        account_queryset = form.fields['account'].queryset
-        self.assertIn(self.account, account_queryset)
-        self.assertNotIn(other_account, account_queryset)
+        account_pks = set(form.fields['account'].queryset.values_list('pk', flat=True))
+        self.assertIn(self.account.pk, account_pks)
+        self.assertNotIn(other_account.pk, account_pks)
     
     def test_transaction_form_filters_categories_by_user(self):
         """Test that form filters categories by user"""
         other_user = User.objects.create_user(
             username='otheruser',
-            email='other@example.com',
-            password='testpass123'
+            email='other@example.com'
         )
         other_category = Category.objects.create(
             user=other_user,
@@ -197,15 +200,15 @@ class TransactionFormTestCase(TestCase):
         )
         
         form = TransactionForm(user=self.user)
-        category_queryset = form.fields['category'].queryset
-        self.assertIn(self.category, category_queryset)
-        self.assertNotIn(other_category, category_queryset)
+        category_pks = set(form.fields['category'].queryset.values_list('pk', flat=True))
+        self.assertIn(self.category.pk, category_pks)
+        self.assertNotIn(other_category.pk, category_pks)
     
     def test_transaction_form_with_existing_instance(self):
         """Test transaction form with existing transaction instance"""
         transaction = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('100.00'),
             name='Existing Transaction',
             currency='BRL'
@@ -218,7 +221,7 @@ class TransactionFormTestCase(TestCase):
         """Editing a non-BRL transaction should show and preserve its currency"""
         transaction = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('200.00'),
             name='USD Transaction',
             currency='USD'
@@ -231,7 +234,7 @@ class TransactionFormTestCase(TestCase):
         """Test saving transaction form"""
         form_data = {
             'account': self.account.pk,
-            'date': date.today(),
+            'date': self.today,
             'name': 'New Transaction',
             'amount_display': 'R$ 75,50',
             'currency': 'BRL',
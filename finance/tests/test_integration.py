@@ -1,8 +1,10 @@
 """
 Integration tests for complex workflows
 """
+import unittest
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from decimal import Decimal
 from datetime import date, timedelta
 from finance.models import (
@@ -18,35 +20,36 @@ User = get_user_model()
 class CompleteWorkflowTestCase(TestCase):
     """Test complete user workflows"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.checking = Account.objects.create(
-            user=self.user,
+        cls.checking = Account.objects.create(
+            user=cls.user,
             name='Checking Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.savings = Account.objects.create(
-            user=self.user,
+        cls.savings = Account.objects.create(
+            user=cls.user,
             name='Savings Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.credit_card = Account.objects.create(
-            user=self.user,
+        cls.credit_card = Account.objects.create(
+            user=cls.user,
             name='Credit Card',
             accountable_type='credit_card',
             currency='BRL',
             status='active'
         )
-        self.category = Category.objects.create(
-            user=self.user,
+        cls.category = Category.objects.create(
+            user=cls.user,
             name='Food',
             classification='expense',
             color='#FF0000'
@@ -57,7 +60,7 @@ class CompleteWorkflowTestCase(TestCase):
         # Create expense transaction (positive amount)
         transaction = Transaction.objects.create(
             account=self.checking,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('50.00'),
             name='Grocery Purchase',
             category=self.category,
@@ -69,26 +72,24 @@ class CompleteWorkflowTestCase(TestCase):
         syncer.sync()
         
         # Verify balance was updated (expense reduces balance)
-        self.checking.refresh_from_db()
+        self.checking.refresh_from_db(fields=['balance'])
         # Balance calculation depends on how the system handles expenses
         # For now, just verify sync completed
         self.assertIsNotNone(self.checking.balance)
         
         # Verify balance records created
-        balances = Balance.objects.filter(account=self.checking)
-        self.assertGreater(balances.count(), 0)
+        self.assertTrue(Balance.objects.filter(account=self.checking).exists())
     
+    @unittest.skip("Transfer matching requires negative amounts but model prevents them")
     def test_complete_transfer_workflow(self):
         """Test complete transfer creation workflow"""
-        # Skip - transfer matching requires negative amounts which model prevents
-        self.skipTest("Transfer matching requires negative amounts but model prevents them")
     
     def test_complete_installment_workflow(self):
         """Test complete installment purchase workflow"""
         # Create installment purchase (positive amount for expense)
         purchase = Transaction.objects.create(
             account=self.credit_card,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('1200.00'),
             name='Installment Purchase',
             installment_current=1,
@@ -115,37 +116,38 @@ class CompleteWorkflowTestCase(TestCase):
         syncer.sync()
         
         # Verify balances account for installments
-        balances = Balance.objects.filter(account=self.credit_card)
-        self.assertGreater(balances.count(), 0)
+        self.assertTrue(Balance.objects.filter(account=self.credit_card).exists())
     
     def test_complete_budget_tracking_workflow(self):
         """Test complete budget creation and tracking workflow"""
         # Create budget
         budget = Budget.objects.create(
             user=self.user,
-            start_date=date.today().replace(day=1),
-            end_date=(date.today().replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1),
+            start_date=self.today.replace(day=1),
+            end_date=(self.today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1),
             currency='BRL',
             budgeted_spending=Decimal('2000.00')
         )
         
         # Create expense transactions (positive amounts)
-        Transaction.objects.create(
-            account=self.checking,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Expense 1',
-            category=self.category,
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.checking,
-            date=date.today(),
-            amount=Decimal('150.00'),
-            name='Expense 2',
-            category=self.category,
-            currency='BRL'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=self.checking,
+                date=self.today,
+                amount=Decimal('100.00'),
+                name='Expense 1',
+                category=self.category,
+                currency='BRL'
+            ),
+            Transaction(
+                account=self.checking,
+                date=self.today,
+                amount=Decimal('150.00'),
+                name='Expense 2',
+                category=self.category,
+                currency='BRL'
+            ),
+        ])
         
         # Check actual spending (sums amounts, may be positive or negative depending on calculation)
         actual = budget.actual_spending
@@ -165,45 +167,45 @@ class CompleteWorkflowTestCase(TestCase):
         )
         
         # Create multiple transactions
-        Transaction.objects.create(
-            account=self.checking,
-            date=date.today() - timedelta(days=5),
-            amount=Decimal('1000.00'),
-            name='Initial Deposit',
-            category=income_category,
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.checking,
-            date=date.today() - timedelta(days=3),
-            amount=Decimal('200.00'),
-            name='Expense 1',
-            category=self.category,
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.checking,
-            date=date.today() - timedelta(days=1),
-            amount=Decimal('100.00'),
-            name='Expense 2',
-            category=self.category,
-            currency='BRL'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=self.checking,
+                date=self.today - timedelta(days=5),
+                amount=Decimal('1000.00'),
+                name='Initial Deposit',
+                category=income_category,
+                currency='BRL'
+            ),
+            Transaction(
+                account=self.checking,
+                date=self.today - timedelta(days=3),
+                amount=Decimal('200.00'),
+                name='Expense 1',
+                category=self.category,
+                currency='BRL'
+            ),
+            Transaction(
+                account=self.checking,
+                date=self.today - timedelta(days=1),
+                amount=Decimal('100.00'),
+                name='Expense 2',
+                category=self.category,
+                currency='BRL'
+            ),
+        ])
         
         # Sync account
         syncer = AccountSyncer(self.checking)
         syncer.sync()
         
-        # Verify balances created for all dates
-        balances = Balance.objects.filter(account=self.checking).order_by('date')
-        self.assertGreater(balances.count(), 0)
-        
-        # Verify latest balance is calculated
-        latest_balance = balances.last()
-        self.assertIsNotNone(latest_balance.balance)
+        # Verify balances were created and the latest one is calculated
+        latest_balance = Balance.objects.filter(
+            account=self.checking
+        ).order_by('-date').values_list('balance', flat=True).first()
+        self.assertIsNotNone(latest_balance)
         
         # Verify account cache updated
-        self.checking.refresh_from_db()
+        self.checking.refresh_from_db(fields=['balance'])
         self.assertIsNotNone(self.checking.balance)
     
     def test_complete_rule_application_workflow(self):
@@ -213,7 +215,7 @@ class CompleteWorkflowTestCase(TestCase):
             user=self.user,
             name='Auto-categorize Uber',
             resource_type='transaction',
-            effective_date=date.today()
+            effective_date=self.today
         )
         
         from finance.models import RuleCondition, RuleAction
@@ -232,7 +234,7 @@ class CompleteWorkflowTestCase(TestCase):
         # Create transaction matching rule (positive amount)
         transaction = Transaction.objects.create(
             account=self.checking,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('25.00'),
             name='Uber Ride',
             category=self.category,
@@ -243,8 +245,8 @@ class CompleteWorkflowTestCase(TestCase):
         rule.apply()
         
         # Verify category was set
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.category, self.category)
+        transaction.refresh_from_db(fields=['category'])
+        self.assertEqual(transaction.category_id, self.category.id)
     
     def test_multi_account_workflow(self):
         """Test workflow involving multiple accounts"""
@@ -256,40 +258,38 @@ class CompleteWorkflowTestCase(TestCase):
         )
         
         # Create transactions across accounts
-        Transaction.objects.create(
-            account=self.checking,
-            date=date.today(),
-            amount=Decimal('5000.00'),
-            name='Salary',
-            category=income_category,
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.credit_card,
-            date=date.today(),
-            amount=Decimal('300.00'),
-            name='Credit Card Purchase',
-            category=self.category,
-            currency='BRL'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=self.checking,
+                date=self.today,
+                amount=Decimal('5000.00'),
+                name='Salary',
+                category=income_category,
+                currency='BRL'
+            ),
+            Transaction(
+                account=self.credit_card,
+                date=self.today,
+                amount=Decimal('300.00'),
+                name='Credit Card Purchase',
+                category=self.category,
+                currency='BRL'
+            ),
+        ])
         
         # Sync all accounts
         for account in [self.checking, self.credit_card]:
             syncer = AccountSyncer(account)
             syncer.sync()
         
-        # Verify both accounts have balances
-        checking_balances = Balance.objects.filter(account=self.checking)
-        credit_balances = Balance.objects.filter(account=self.credit_card)
-        
-        self.assertGreater(checking_balances.count(), 0)
-        self.assertGreater(credit_balances.count(), 0)
+        # Verify both accounts have balances and updated balance caches in one query
+        accounts = Account.objects.filter(
+            pk__in=[self.checking.pk, self.credit_card.pk]
+        ).annotate(balance_count=Count('balances'))
         
-        # Verify account balances updated
-        self.checking.refresh_from_db()
-        self.credit_card.refresh_from_db()
-        
-        # Balances should be calculated (exact values depend on calculation logic)
-        self.assertIsNotNone(self.checking.balance)
-        self.assertIsNotNone(self.credit_card.balance)
+        self.assertEqual(len(accounts), 2)
+        for account in accounts:
+            self.assertGreater(account.balance_count, 0)
+            # Balances should be calculated (exact values depend on calculation logic)
+            self.assertIsNotNone(account.balance)
 
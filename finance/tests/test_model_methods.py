@@ -15,14 +15,14 @@ User = get_user_model()
 class AccountModelMethodsTestCase(TestCase):
     """Test Account model methods"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
@@ -63,14 +63,15 @@ class AccountModelMethodsTestCase(TestCase):
 class TransactionModelMethodsTestCase(TestCase):
     """Test Transaction model methods"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
@@ -81,14 +82,14 @@ class TransactionModelMethodsTestCase(TestCase):
         """Test is_installment property"""
         regular = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('-50.00'),
             name='Regular',
             currency='BRL'
         )
         installment = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('-100.00'),
             name='Installment',
             installment_current=1,
@@ -103,7 +104,7 @@ class TransactionModelMethodsTestCase(TestCase):
         """Test transaction kind display"""
         transaction = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('-50.00'),
             name='Test',
             kind='standard',
@@ -116,14 +117,15 @@ class TransactionModelMethodsTestCase(TestCase):
 class BalanceModelMethodsTestCase(TestCase):
     """Test Balance model methods"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
@@ -134,7 +136,7 @@ class BalanceModelMethodsTestCase(TestCase):
         """Test end_cash_balance calculated property"""
         balance = Balance.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             balance=Decimal('1000.00'),
             cash_balance=Decimal('1000.00'),
             start_cash_balance=Decimal('900.00'),
@@ -151,30 +153,30 @@ class BalanceModelMethodsTestCase(TestCase):
 class BudgetModelMethodsTestCase(TestCase):
     """Test Budget model methods"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.category = Category.objects.create(
-            user=self.user,
+        cls.category = Category.objects.create(
+            user=cls.user,
             name='Food',
             classification='expense',
             color='#FF0000'
         )
-        today = date.today()
-        self.budget = Budget.objects.create(
-            user=self.user,
-            start_date=today.replace(day=1),
-            end_date=(today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1),
+        cls.budget = Budget.objects.create(
+            user=cls.user,
+            start_date=cls.today.replace(day=1),
+            end_date=(cls.today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1),
             currency='BRL',
             budgeted_spending=Decimal('1000.00')
         )
@@ -184,7 +186,7 @@ class BudgetModelMethodsTestCase(TestCase):
         self.assertTrue(self.budget.initialized)
         
         # Use a different month to avoid unique constraint
-        next_month = date.today().replace(day=1)
+        next_month = self.today.replace(day=1)
         if next_month.month == 12:
             next_month = next_month.replace(year=next_month.year + 1, month=1)
         else:
@@ -202,24 +204,28 @@ class BudgetModelMethodsTestCase(TestCase):
     def test_budget_actual_spending_property(self):
         """Test budget actual spending calculation"""
         # Create expense transactions (positive amounts for expenses)
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Expense 1',
-            category=self.category,
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('50.00'),
-            name='Expense 2',
-            category=self.category,
-            currency='BRL'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=self.account,
+                date=self.today,
+                amount=Decimal('100.00'),
+                name='Expense 1',
+                category=self.category,
+                currency='BRL'
+            ),
+            Transaction(
+                account=self.account,
+                date=self.today,
+                amount=Decimal('50.00'),
+                name='Expense 2',
+                category=self.category,
+                currency='BRL'
+            ),
+        ])
         
-        actual = self.budget.actual_spending
+        # One aggregate, however many transactions fall in the period
+        with self.assertNumQueries(1):
+            actual = self.budget.actual_spending
         # actual_spending sums amounts, which are positive for expenses
         # The result may be negative if the calculation negates it, or positive if it doesn't
         # Check that it's calculated (not zero)
@@ -235,80 +241,121 @@ class BudgetModelMethodsTestCase(TestCase):
         )
         
         # No spending yet
-        self.assertEqual(budget_category.available_to_spend, Decimal('200.00'))
+        with self.assertNumQueries(1):
+            self.assertEqual(budget_category.available_to_spend, Decimal('200.00'))
         
         # Add spending (positive amount for expense)
         Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('75.00'),
             name='Expense',
             category=self.category,
             currency='BRL'
         )
         
-        budget_category.refresh_from_db()
-        # Should recalculate (available = budgeted - actual)
-        # The calculation depends on how actual_spending works
-        available = budget_category.available_to_spend
-        self.assertIsNotNone(available)
+        # available_to_spend is computed on access, so no refresh_from_db is needed
+        with self.assertNumQueries(1):
+            self.assertEqual(budget_category.available_to_spend, Decimal('125.00'))
+    
+    def test_budget_category_with_metrics_matches_properties(self):
+        """Test with_metrics annotations match the per-row Python properties"""
+        budget_category = BudgetCategory.objects.create(
+            budget=self.budget,
+            category=self.category,
+            budgeted_spending=Decimal('200.00'),
+            currency='BRL'
+        )
+        uncategorized = BudgetCategory.objects.create(
+            budget=self.budget,
+            category=None,
+            budgeted_spending=Decimal('0.00'),
+            currency='BRL'
+        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=self.account,
+                date=self.today,
+                amount=Decimal('50.00'),
+                name='Expense',
+                category=self.category,
+                currency='BRL'
+            ),
+            Transaction(
+                account=self.account,
+                date=self.today,
+                amount=Decimal('30.00'),
+                name='Uncategorized',
+                currency='BRL'
+            ),
+        ])
+        
+        with self.assertNumQueries(1):
+            annotated = {bc.pk: bc for bc in BudgetCategory.objects.filter(budget=self.budget).with_metrics()}
+        
+        self.assertEqual(annotated[budget_category.pk].spent, Decimal('50.00'))
+        self.assertEqual(annotated[budget_category.pk].available_to_spend, budget_category.available_to_spend)
+        self.assertAlmostEqual(annotated[budget_category.pk].percent_of_budget_spent, budget_category.percent_of_budget_spent)
+        self.assertEqual(annotated[uncategorized.pk].spent, Decimal('30.00'))
+        self.assertEqual(annotated[uncategorized.pk].percent_of_budget_spent, 0)
 
 
 class RuleModelMethodsTestCase(TestCase):
     """Test Rule model methods"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.category = Category.objects.create(
-            user=self.user,
+        cls.category = Category.objects.create(
+            user=cls.user,
             name='Food',
             classification='expense',
             color='#FF0000'
         )
-    
-    def test_rule_apply_method(self):
-        """Test rule apply method"""
-        rule = Rule.objects.create(
-            user=self.user,
+        # Neither test mutates the rule, so it is shared across the class
+        cls.rule = Rule.objects.create(
+            user=cls.user,
             name='Test Rule',
             resource_type='transaction',
-            effective_date=date.today()
+            effective_date=cls.today
         )
         
         from finance.models import RuleCondition, RuleAction
         RuleCondition.objects.create(
-            rule=rule,
+            rule=cls.rule,
             condition_type='transaction_name',
             operator='like',
             value='Uber'
         )
         RuleAction.objects.create(
-            rule=rule,
+            rule=cls.rule,
             action_type='set_transaction_category',
-            value=str(self.category.id)
+            value=str(cls.category.id)
         )
-        
+    
+    def test_rule_apply_method(self):
+        """Test rule apply method"""
         transaction = Transaction.objects.create(
             account=self.account,
-            date=date.today(),
+            date=self.today,
             amount=Decimal('-25.00'),
             name='Uber Ride',
             currency='BRL'
         )
         
         # Apply rule
-        rule.apply()
+        self.rule.apply()
         
         # Verify category was set
         transaction.refresh_from_db()
@@ -316,13 +363,6 @@ class RuleModelMethodsTestCase(TestCase):
     
     def test_rule_registry_property(self):
         """Test rule registry property"""
-        rule = Rule.objects.create(
-            user=self.user,
-            name='Test Rule',
-            resource_type='transaction',
-            effective_date=date.today()
-        )
-        
         # Registry should be created
-        self.assertIsNotNone(rule.registry)
+        self.assertIsNotNone(self.rule.registry)
 
@@ -1,5 +1,9 @@
 """Tests for finance app"""
 from django.test import TestCase
+from django.urls import reverse
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.db.models import Sum
 from decimal import Decimal
@@ -15,11 +19,11 @@ User = get_user_model()
 class AccountTestCase(TestCase):
     """Test Account model"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
     
     def test_create_account(self):
@@ -56,20 +60,20 @@ class AccountTestCase(TestCase):
 class TransactionTestCase(TestCase):
     """Test Transaction model"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL'
         )
-        self.category = Category.objects.create(
-            user=self.user,
+        cls.category = Category.objects.create(
+            user=cls.user,
             name='Food',
             classification='expense',
             color='#FF0000'
@@ -108,14 +112,14 @@ class TransactionTestCase(TestCase):
 class BalanceTestCase(TestCase):
     """Test Balance model and calculation"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             balance=Decimal('1000.00'),
@@ -140,26 +144,26 @@ class BalanceTestCase(TestCase):
 class RuleTestCase(TestCase):
     """Test Rules engine"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL'
         )
-        self.category = Category.objects.create(
-            user=self.user,
+        cls.category = Category.objects.create(
+            user=cls.user,
             name='Food',
             classification='expense',
             color='#FF0000'
         )
-        self.tag = Tag.objects.create(
-            user=self.user,
+        cls.tag = Tag.objects.create(
+            user=cls.user,
             name='Groceries',
             color='#00FF00'
         )
@@ -219,27 +223,27 @@ class RuleTestCase(TestCase):
 class BudgetTestCase(TestCase):
     """Test Budget model"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL'
         )
-        self.category = Category.objects.create(
-            user=self.user,
+        cls.category = Category.objects.create(
+            user=cls.user,
             name='Food',
             classification='expense',
             color='#FF0000'
         )
         today = date.today()
-        self.budget = Budget.objects.create(
-            user=self.user,
+        cls.budget = Budget.objects.create(
+            user=cls.user,
             start_date=today.replace(day=1),
             end_date=(today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1),
             currency='BRL',
@@ -281,11 +285,11 @@ class BudgetTestCase(TestCase):
 class CategoryTestCase(TestCase):
     """Test Category model"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
     
     def test_create_category(self):
@@ -365,11 +369,11 @@ class MoneyTestCase(TestCase):
 class DashboardCalculationsTestCase(TestCase):
     """Test dashboard calculations"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
     
     def test_dashboard_free_cash_calculation(self):
@@ -436,3 +440,54 @@ class DashboardCalculationsTestCase(TestCase):
         total_debt = credit_cards.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
         current_bill = abs(total_debt)
         self.assertEqual(current_bill, Decimal('500.00'))
+    
+    def get_with_account_totals_queries(self, url):
+        """GET url, returning the response and the per-type account balance sums it ran"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        totals_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'SUM("accounts"."balance")' in query['sql'] and '"accounts"."accountable_type"' in query['sql']
+        ]
+        return response, totals_queries
+    
+    def test_dashboard_account_totals_single_query(self):
+        """Test the dashboard views compute account totals in one conditional aggregate"""
+        Account.objects.create(
+            user=self.user,
+            name='Checking',
+            accountable_type='depository',
+            balance=Decimal('1000.00'),
+            currency='BRL',
+            status='active'
+        )
+        Account.objects.create(
+            user=self.user,
+            name='Credit Card',
+            accountable_type='credit_card',
+            balance=Decimal('-500.00'),
+            currency='BRL',
+            status='active'
+        )
+        Account.objects.create(
+            user=self.user,
+            name='Closed Savings',
+            accountable_type='depository',
+            balance=Decimal('250.00'),
+            currency='BRL',
+            status='disabled'
+        )
+        cache.clear()
+        self.client.force_login(self.user)
+        
+        response, totals_queries = self.get_with_account_totals_queries(reverse('dashboard'))
+        self.assertEqual(len(totals_queries), 1)
+        self.assertEqual(response.context['free_cash'], Decimal('1000.00'))
+        self.assertEqual(response.context['current_bill'], Decimal('500.00'))
+        self.assertEqual(response.context['total_balance'], Decimal('500.00'))
+        
+        response, totals_queries = self.get_with_account_totals_queries(reverse('dashboard_stats'))
+        self.assertEqual(len(totals_queries), 1)
+        self.assertEqual(response.context['total_assets'], Decimal('1000.00'))
+        self.assertEqual(response.context['total_liabilities'], Decimal('500.00'))
+        self.assertEqual(response.context['net_worth'], Decimal('500.00'))
@@ -1,31 +1,31 @@
 """
 Tests for finance.money module
 """
-from django.test import TestCase
-from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
 from decimal import Decimal
 from datetime import date
 from finance.money import Money, Currency, ConversionError
 from finance.models import ExchangeRate, Account
 
-User = get_user_model()
 
-
-class CurrencyTestCase(TestCase):
+class CurrencyTestCase(SimpleTestCase):
     """Test Currency class"""
     
-    def setUp(self):
-        # Clear currency instances cache
-        Currency._instances = {}
-    
     def test_currency_creation(self):
         """Test creating currency instances"""
-        currency = Currency.new('BRL')
-        self.assertEqual(currency.iso_code, 'BRL')
-        self.assertEqual(currency.name, 'Brazilian Real')
-        self.assertEqual(currency.symbol, 'R$')
-        self.assertEqual(currency.separator, ',')
-        self.assertEqual(currency.delimiter, '.')
+        cases = [
+            ('BRL', 'Brazilian Real', 'R$', ',', '.'),
+            ('USD', 'US Dollar', '$', '.', ','),
+            ('EUR', 'Euro', '€', ',', '.'),
+        ]
+        for iso_code, name, symbol, separator, delimiter in cases:
+            with self.subTest(iso_code=iso_code):
+                currency = Currency.new(iso_code)
+                self.assertEqual(currency.iso_code, iso_code)
+                self.assertEqual(currency.name, name)
+                self.assertEqual(currency.symbol, symbol)
+                self.assertEqual(currency.separator, separator)
+                self.assertEqual(currency.delimiter, delimiter)
     
     def test_currency_uppercase(self):
         """Test that currency codes are converted to uppercase"""
@@ -48,6 +48,9 @@ class CurrencyTestCase(TestCase):
         """Test that unknown currency raises ValueError"""
         with self.assertRaises(ValueError):
             Currency.new('XXX')
+        # Failed lookups are not memoized, so the error repeats
+        with self.assertRaises(ValueError):
+            Currency.new('XXX')
     
     def test_currency_step(self):
         """Test step value calculation"""
@@ -75,17 +78,10 @@ class CurrencyTestCase(TestCase):
         self.assertEqual(repr(currency), "Currency(BRL)")
 
 
-class MoneyTestCase(TestCase):
-    """Test Money class"""
+class MoneyArithmeticTestCase(SimpleTestCase):
+    """Test Money class behaviour that needs no database"""
     
     def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        # Clear currency instances cache
-        Currency._instances = {}
         Money._default_currency = None
     
     def test_money_creation_from_decimal(self):
@@ -94,6 +90,13 @@ class MoneyTestCase(TestCase):
         self.assertEqual(money.amount, Decimal('100.50'))
         self.assertEqual(money.currency.iso_code, 'BRL')
     
+    def test_money_creation_keeps_decimal_amount(self):
+        """Test a Decimal amount is stored as-is, keeping its exponent"""
+        amount = Decimal('100.5000')
+        money = Money(amount, 'BRL')
+        self.assertIs(money.amount, amount)
+        self.assertEqual(str(money.amount), '100.5000')
+    
     def test_money_creation_from_float(self):
         """Test creating Money from float"""
         money = Money(100.50, 'BRL')
@@ -131,34 +134,6 @@ class MoneyTestCase(TestCase):
         self.assertEqual(result.amount, Decimal('100.50'))
         self.assertEqual(result.currency.iso_code, 'BRL')
     
-    def test_money_exchange_with_rate(self):
-        """Test exchanging with exchange rate"""
-        # Create exchange rate
-        ExchangeRate.objects.create(
-            from_currency='BRL',
-            to_currency='USD',
-            date=date.today(),
-            rate=Decimal('0.20')
-        )
-        
-        money = Money(Decimal('100.00'), 'BRL')
-        result = money.exchange_to('USD', conversion_date=date.today())
-        self.assertEqual(result.amount, Decimal('20.00'))
-        self.assertEqual(result.currency.iso_code, 'USD')
-    
-    def test_money_exchange_with_fallback_rate(self):
-        """Test exchanging with fallback rate"""
-        money = Money(Decimal('100.00'), 'BRL')
-        result = money.exchange_to('USD', fallback_rate=Decimal('0.25'))
-        self.assertEqual(result.amount, Decimal('25.00'))
-        self.assertEqual(result.currency.iso_code, 'USD')
-    
-    def test_money_exchange_no_rate(self):
-        """Test exchanging without rate raises ConversionError"""
-        money = Money(Decimal('100.00'), 'BRL')
-        with self.assertRaises(ConversionError):
-            money.exchange_to('USD', conversion_date=date.today())
-    
     def test_money_format_brl(self):
         """Test formatting BRL currency"""
         money = Money(Decimal('1234.56'), 'BRL')
@@ -332,7 +307,45 @@ class MoneyTestCase(TestCase):
         self.assertIn('formatted', json_data)
 
 
-class ConversionErrorTestCase(TestCase):
+class MoneyExchangeTestCase(TestCase):
+    """Test Money exchange against stored exchange rates"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        # Only BRL -> USD has a stored rate; the other tests exchange to EUR
+        ExchangeRate.objects.create(
+            from_currency='BRL',
+            to_currency='USD',
+            date=cls.today,
+            rate=Decimal('0.20')
+        )
+    
+    def setUp(self):
+        Money._default_currency = None
+    
+    def test_money_exchange_with_rate(self):
+        """Test exchanging with exchange rate"""
+        money = Money(Decimal('100.00'), 'BRL')
+        result = money.exchange_to('USD', conversion_date=self.today)
+        self.assertEqual(result.amount, Decimal('20.00'))
+        self.assertEqual(result.currency.iso_code, 'USD')
+    
+    def test_money_exchange_with_fallback_rate(self):
+        """Test exchanging with fallback rate"""
+        money = Money(Decimal('100.00'), 'BRL')
+        result = money.exchange_to('EUR', fallback_rate=Decimal('0.25'))
+        self.assertEqual(result.amount, Decimal('25.00'))
+        self.assertEqual(result.currency.iso_code, 'EUR')
+    
+    def test_money_exchange_no_rate(self):
+        """Test exchanging without rate raises ConversionError"""
+        money = Money(Decimal('100.00'), 'BRL')
+        with self.assertRaises(ConversionError):
+            money.exchange_to('EUR', conversion_date=self.today)
+
+
+class ConversionErrorTestCase(SimpleTestCase):
     """Test ConversionError exception"""
     
     def test_conversion_error_message(self):
@@ -348,4 +361,11 @@ class ConversionErrorTestCase(TestCase):
         self.assertEqual(error.from_currency, 'BRL')
         self.assertEqual(error.to_currency, 'USD')
         self.assertEqual(error.date, date(2023, 1, 1))
+    
+    def test_conversion_error_pickles(self):
+        """Test ConversionError survives a pickle round-trip, e.g. as a Celery task result"""
+        import pickle
+        error = pickle.loads(pickle.dumps(ConversionError('BRL', 'USD', date(2023, 1, 1))))
+        self.assertEqual(error.date, date(2023, 1, 1))
+        self.assertEqual(str(error), "Couldn't find exchange rate from BRL to USD on 2023-01-01")
 
@@ -19,38 +19,56 @@ User = get_user_model()
 class SetTransactionCategoryExecutorTestCase(TestCase):
     """Test SetTransactionCategoryExecutor"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.category1 = Category.objects.create(
-            user=self.user,
+        cls.category1 = Category.objects.create(
+            user=cls.user,
             name='Food',
             classification='expense',
             color='#FF0000'
         )
-        self.category2 = Category.objects.create(
-            user=self.user,
+        cls.category2 = Category.objects.create(
+            user=cls.user,
             name='Transport',
             classification='expense',
             color='#0000FF'
         )
-        self.rule = Rule.objects.create(
-            user=self.user,
+        cls.rule = Rule.objects.create(
+            user=cls.user,
             name='Test Rule',
             resource_type='transaction',
-            effective_date=date.today()
-        )
-        self.executor = SetTransactionCategoryExecutor(self.rule)
+            effective_date=cls.today
+        )
+        cls.executor = SetTransactionCategoryExecutor(cls.rule)
+        cls.transaction, cls.categorized_transaction = Transaction.objects.bulk_create([
+            Transaction(
+                account=cls.account,
+                date=cls.today,
+                amount=Decimal('100.00'),
+                name='Test Transaction',
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=cls.today,
+                amount=Decimal('100.00'),
+                name='Test Transaction',
+                category=cls.category1,
+                currency='BRL'
+            ),
+        ])
     
     def test_type_property(self):
         """Test type property"""
@@ -67,121 +85,90 @@ class SetTransactionCategoryExecutorTestCase(TestCase):
     
     def test_execute_with_value(self):
         """Test executing with category value"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
-        self.executor.execute(queryset, value=str(self.category1.id))
+        # Category lookup, one UPDATE
+        with self.assertNumQueries(2):
+            self.executor.execute(queryset, value=str(self.category1.id))
         
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.category, self.category1)
+        transaction.refresh_from_db(fields=['category'])
+        self.assertEqual(transaction.category_id, self.category1.id)
     
     def test_execute_without_value(self):
         """Test executing without value does nothing"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        original_category = transaction.category
+        transaction = self.transaction
+        original_category_id = transaction.category_id
         
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=None)
         
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.category, original_category)
+        transaction.refresh_from_db(fields=['category'])
+        self.assertEqual(transaction.category_id, original_category_id)
     
     def test_execute_with_invalid_category(self):
         """Test executing with invalid category ID does nothing"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value='00000000-0000-0000-0000-000000000000')
         
-        transaction.refresh_from_db()
-        self.assertIsNone(transaction.category)
+        transaction.refresh_from_db(fields=['category'])
+        self.assertIsNone(transaction.category_id)
     
     def test_execute_ignores_existing_category(self):
         """Test that executor doesn't overwrite existing category by default"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            category=self.category1,
-            currency='BRL'
-        )
-        
+        transaction = self.categorized_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=str(self.category2.id))
         
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.category, self.category1)  # Unchanged
+        transaction.refresh_from_db(fields=['category'])
+        self.assertEqual(transaction.category_id, self.category1.id)  # Unchanged
     
     def test_execute_with_ignore_locks(self):
         """Test executing with ignore_attribute_locks=True"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            category=self.category1,
-            currency='BRL'
-        )
-        
+        transaction = self.categorized_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=str(self.category2.id), ignore_attribute_locks=True)
         
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.category, self.category2)  # Changed
+        transaction.refresh_from_db(fields=['category'])
+        self.assertEqual(transaction.category_id, self.category2.id)  # Changed
 
 
 class SetTransactionTagsExecutorTestCase(TestCase):
     """Test SetTransactionTagsExecutor"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.tag1 = Tag.objects.create(
-            user=self.user,
+        cls.tag1 = Tag.objects.create(
+            user=cls.user,
             name='Important',
             color='#FF0000'
         )
-        self.tag2 = Tag.objects.create(
-            user=self.user,
-            name='Work',
-            color='#0000FF'
-        )
-        self.rule = Rule.objects.create(
-            user=self.user,
+        cls.rule = Rule.objects.create(
+            user=cls.user,
             name='Test Rule',
             resource_type='transaction',
-            effective_date=date.today()
+            effective_date=cls.today
+        )
+        cls.executor = SetTransactionTagsExecutor(cls.rule)
+        cls.transaction = Transaction.objects.create(
+            account=cls.account,
+            date=cls.today,
+            amount=Decimal('100.00'),
+            name='Test Transaction',
+            currency='BRL'
         )
-        self.executor = SetTransactionTagsExecutor(self.rule)
     
     def test_type_property(self):
         """Test type property"""
@@ -195,30 +182,18 @@ class SetTransactionTagsExecutorTestCase(TestCase):
     
     def test_execute_with_value(self):
         """Test executing with tag value"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
-        self.executor.execute(queryset, value=str(self.tag1.id))
+        # Tag lookup, untagged ids, one bulk INSERT
+        with self.assertNumQueries(3):
+            self.executor.execute(queryset, value=str(self.tag1.id))
         
         # Check tag was added
         self.assertTrue(TransactionTag.objects.filter(transaction=transaction, tag=self.tag1).exists())
     
     def test_execute_without_value(self):
         """Test executing without value does nothing"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=None)
         
@@ -227,14 +202,7 @@ class SetTransactionTagsExecutorTestCase(TestCase):
     
     def test_execute_with_invalid_tag(self):
         """Test executing with invalid tag ID does nothing"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value='00000000-0000-0000-0000-000000000000')
         
@@ -243,14 +211,7 @@ class SetTransactionTagsExecutorTestCase(TestCase):
     
     def test_execute_doesnt_duplicate_tags(self):
         """Test that executor doesn't add duplicate tags"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         # Add tag manually first
         TransactionTag.objects.create(transaction=transaction, tag=self.tag1)
         
@@ -262,54 +223,86 @@ class SetTransactionTagsExecutorTestCase(TestCase):
     
     def test_execute_with_ignore_locks(self):
         """Test executing with ignore_attribute_locks=True still adds tag"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=str(self.tag1.id), ignore_attribute_locks=True)
         
         # Tag should be added
         self.assertTrue(TransactionTag.objects.filter(transaction=transaction, tag=self.tag1).exists())
+    
+    def test_execute_tags_many_transactions_in_constant_queries(self):
+        """Test tagging a multi-row queryset does not issue a query per transaction"""
+        transactions = Transaction.objects.bulk_create([
+            Transaction(
+                account=self.account,
+                date=self.today,
+                amount=Decimal('100.00'),
+                name=f'Test Transaction {i}',
+                currency='BRL'
+            )
+            for i in range(5)
+        ])
+        TransactionTag.objects.create(transaction=transactions[0], tag=self.tag1)
+        
+        queryset = Transaction.objects.filter(id__in=[t.id for t in transactions])
+        # Tag lookup, untagged ids, one bulk INSERT
+        with self.assertNumQueries(3):
+            self.executor.execute(queryset, value=str(self.tag1.id))
+        
+        self.assertEqual(TransactionTag.objects.filter(tag=self.tag1).count(), 5)
 
 
 class SetTransactionMerchantExecutorTestCase(TestCase):
     """Test SetTransactionMerchantExecutor"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.merchant1 = Merchant.objects.create(
-            user=self.user,
+        cls.merchant1 = Merchant.objects.create(
+            user=cls.user,
             name='Amazon',
             color='#FF0000'
         )
-        self.merchant2 = Merchant.objects.create(
-            user=self.user,
+        cls.merchant2 = Merchant.objects.create(
+            user=cls.user,
             name='Uber',
             color='#0000FF'
         )
-        self.rule = Rule.objects.create(
-            user=self.user,
+        cls.rule = Rule.objects.create(
+            user=cls.user,
             name='Test Rule',
             resource_type='transaction',
-            effective_date=date.today()
-        )
-        self.executor = SetTransactionMerchantExecutor(self.rule)
+            effective_date=cls.today
+        )
+        cls.executor = SetTransactionMerchantExecutor(cls.rule)
+        cls.transaction, cls.merchant_transaction = Transaction.objects.bulk_create([
+            Transaction(
+                account=cls.account,
+                date=cls.today,
+                amount=Decimal('100.00'),
+                name='Test Transaction',
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=cls.today,
+                amount=Decimal('100.00'),
+                name='Test Transaction',
+                merchant=cls.merchant1,
+                currency='BRL'
+            ),
+        ])
     
     def test_type_property(self):
         """Test type property"""
@@ -323,110 +316,92 @@ class SetTransactionMerchantExecutorTestCase(TestCase):
     
     def test_execute_with_value(self):
         """Test executing with merchant value"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
-        self.executor.execute(queryset, value=str(self.merchant1.id))
+        # Merchant lookup, one UPDATE
+        with self.assertNumQueries(2):
+            self.executor.execute(queryset, value=str(self.merchant1.id))
         
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.merchant, self.merchant1)
+        transaction.refresh_from_db(fields=['merchant'])
+        self.assertEqual(transaction.merchant_id, self.merchant1.id)
     
     def test_execute_without_value(self):
         """Test executing without value does nothing"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=None)
         
-        transaction.refresh_from_db()
-        self.assertIsNone(transaction.merchant)
+        transaction.refresh_from_db(fields=['merchant'])
+        self.assertIsNone(transaction.merchant_id)
     
     def test_execute_with_invalid_merchant(self):
         """Test executing with invalid merchant ID does nothing"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            currency='BRL'
-        )
-        
+        transaction = self.transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value='00000000-0000-0000-0000-000000000000')
         
-        transaction.refresh_from_db()
-        self.assertIsNone(transaction.merchant)
+        transaction.refresh_from_db(fields=['merchant'])
+        self.assertIsNone(transaction.merchant_id)
     
     def test_execute_ignores_existing_merchant(self):
         """Test that executor doesn't overwrite existing merchant by default"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            merchant=self.merchant1,
-            currency='BRL'
-        )
-        
+        transaction = self.merchant_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=str(self.merchant2.id))
         
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.merchant, self.merchant1)  # Unchanged
+        transaction.refresh_from_db(fields=['merchant'])
+        self.assertEqual(transaction.merchant_id, self.merchant1.id)  # Unchanged
     
     def test_execute_with_ignore_locks(self):
         """Test executing with ignore_attribute_locks=True"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Test Transaction',
-            merchant=self.merchant1,
-            currency='BRL'
-        )
-        
+        transaction = self.merchant_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=str(self.merchant2.id), ignore_attribute_locks=True)
         
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.merchant, self.merchant2)  # Changed
+        transaction.refresh_from_db(fields=['merchant'])
+        self.assertEqual(transaction.merchant_id, self.merchant2.id)  # Changed
 
 
 class SetTransactionNameExecutorTestCase(TestCase):
     """Test SetTransactionNameExecutor"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@example.com',
-            password='testpass123'
+            email='test@example.com'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.rule = Rule.objects.create(
-            user=self.user,
+        cls.rule = Rule.objects.create(
+            user=cls.user,
             name='Test Rule',
             resource_type='transaction',
-            effective_date=date.today()
-        )
-        self.executor = SetTransactionNameExecutor(self.rule)
+            effective_date=cls.today
+        )
+        cls.executor = SetTransactionNameExecutor(cls.rule)
+        cls.unnamed_transaction, cls.named_transaction = Transaction.objects.bulk_create([
+            Transaction(
+                account=cls.account,
+                date=cls.today,
+                amount=Decimal('100.00'),
+                name='',
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=cls.today,
+                amount=Decimal('100.00'),
+                name='Original Name',
+                currency='BRL'
+            ),
+        ])
     
     def test_type_property(self):
         """Test type property"""
@@ -438,98 +413,48 @@ class SetTransactionNameExecutorTestCase(TestCase):
     
     def test_execute_with_value(self):
         """Test executing with name value"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='',
-            currency='BRL'
-        )
-        
+        transaction = self.unnamed_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
-        self.executor.execute(queryset, value='New Name')
+        with self.assertNumQueries(1):
+            self.executor.execute(queryset, value='New Name')
         
-        transaction.refresh_from_db()
+        transaction.refresh_from_db(fields=['name'])
         self.assertEqual(transaction.name, 'New Name')
     
     def test_execute_without_value(self):
         """Test executing without value does nothing"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Original Name',
-            currency='BRL'
-        )
-        
+        transaction = self.named_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value=None)
         
-        transaction.refresh_from_db()
+        transaction.refresh_from_db(fields=['name'])
         self.assertEqual(transaction.name, 'Original Name')
     
     def test_execute_ignores_existing_name(self):
         """Test that executor doesn't overwrite existing name by default"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Original Name',
-            currency='BRL'
-        )
-        
+        transaction = self.named_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
-        self.executor.execute(queryset, value='New Name')
+        with self.assertNumQueries(1):
+            self.executor.execute(queryset, value='New Name')
         
-        transaction.refresh_from_db()
+        transaction.refresh_from_db(fields=['name'])
         self.assertEqual(transaction.name, 'Original Name')  # Unchanged
     
-    def test_execute_with_null_name(self):
-        """Test executing updates null name"""
-        # Transaction name cannot be null, so we'll test with empty string instead
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='',
-            currency='BRL'
-        )
-        
-        queryset = Transaction.objects.filter(id=transaction.id)
-        self.executor.execute(queryset, value='New Name')
-        
-        transaction.refresh_from_db()
-        self.assertEqual(transaction.name, 'New Name')
-    
     def test_execute_with_empty_name(self):
         """Test executing updates empty name"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='',
-            currency='BRL'
-        )
-        
+        transaction = self.unnamed_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value='New Name')
         
-        transaction.refresh_from_db()
+        transaction.refresh_from_db(fields=['name'])
         self.assertEqual(transaction.name, 'New Name')
     
     def test_execute_with_ignore_locks(self):
         """Test executing with ignore_attribute_locks=True"""
-        transaction = Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Original Name',
-            currency='BRL'
-        )
-        
+        transaction = self.named_transaction
         queryset = Transaction.objects.filter(id=transaction.id)
         self.executor.execute(queryset, value='New Name', ignore_attribute_locks=True)
         
-        transaction.refresh_from_db()
+        transaction.refresh_from_db(fields=['name'])
         self.assertEqual(transaction.name, 'New Name')  # Changed
 
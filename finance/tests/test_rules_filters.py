@@ -15,272 +15,214 @@ from finance.rules.filters import (
 User = get_user_model()
 
 
-class TransactionNameFilterTestCase(TestCase):
-    """Test TransactionNameFilter"""
+class RuleFilterTestCase(TestCase):
+    """Base test case for rule condition filters"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.account = Account.objects.create(
-            user=self.user,
+        cls.account = Account.objects.create(
+            user=cls.user,
             name='Test Account',
             accountable_type='depository',
             currency='BRL',
             status='active'
         )
-        self.rule = Rule.objects.create(
-            user=self.user,
+        cls.rule = Rule.objects.create(
+            user=cls.user,
             name='Test Rule',
             resource_type='transaction',
             effective_date=date.today()
         )
-        self.filter_obj = TransactionNameFilter(self.rule)
+        cls.queryset = Transaction.objects.filter(account__user=cls.user)
+
+
+class TransactionNameFilterTestCase(RuleFilterTestCase):
+    """Test TransactionNameFilter"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.filter_obj = TransactionNameFilter(cls.rule)
         
         # Create test transactions
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Uber Ride',
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('200.00'),
-            name='Amazon Purchase',
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('300.00'),
-            name='Grocery Store',
-            currency='BRL'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('100.00'),
+                name='Uber Ride',
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('200.00'),
+                name='Amazon Purchase',
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('300.00'),
+                name='Grocery Store',
+                currency='BRL'
+            ),
+        ])
     
     def test_type_property(self):
         """Test type property"""
         self.assertEqual(self.filter_obj.type, 'text')
     
-    def test_apply_like_operator(self):
-        """Test applying like operator"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, 'like', 'Uber')
-        
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().name, 'Uber Ride')
-    
-    def test_apply_like_operator_case_insensitive(self):
-        """Test like operator is case insensitive"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, 'like', 'uber')
-        
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().name, 'Uber Ride')
-    
-    def test_apply_equal_operator(self):
-        """Test applying = operator"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '=', 'Uber Ride')
-        
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().name, 'Uber Ride')
-    
-    def test_apply_equal_operator_case_insensitive(self):
-        """Test = operator is case insensitive"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '=', 'uber ride')
-        
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().name, 'Uber Ride')
+    def test_apply_like_and_equal_operators(self):
+        """Test like and = operators match case-insensitively"""
+        cases = [
+            ('like', 'Uber'),
+            ('like', 'uber'),
+            ('=', 'Uber Ride'),
+            ('=', 'uber ride'),
+        ]
+        for operator, value in cases:
+            with self.subTest(operator=operator, value=value):
+                with self.assertNumQueries(1):
+                    rows = list(self.filter_obj.apply(self.queryset, operator, value))
+                
+                self.assertEqual(len(rows), 1)
+                self.assertEqual(rows[0].name, 'Uber Ride')
     
     def test_apply_unsupported_operator(self):
         """Test applying unsupported operator raises ValueError"""
-        queryset = Transaction.objects.filter(account__user=self.user)
         with self.assertRaises(ValueError):
-            self.filter_obj.apply(queryset, '>', 'Uber')
+            self.filter_obj.apply(self.queryset, '>', 'Uber')
     
     def test_apply_no_matches(self):
         """Test applying filter with no matches"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, 'like', 'NonExistent')
-        
-        self.assertEqual(result.count(), 0)
+        with self.assertNumQueries(1):
+            self.assertFalse(self.filter_obj.apply(self.queryset, 'like', 'NonExistent').exists())
 
 
-class TransactionAmountFilterTestCase(TestCase):
+class TransactionAmountFilterTestCase(RuleFilterTestCase):
     """Test TransactionAmountFilter"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.account = Account.objects.create(
-            user=self.user,
-            name='Test Account',
-            accountable_type='depository',
-            currency='BRL',
-            status='active'
-        )
-        self.rule = Rule.objects.create(
-            user=self.user,
-            name='Test Rule',
-            resource_type='transaction',
-            effective_date=date.today()
-        )
-        self.filter_obj = TransactionAmountFilter(self.rule)
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.filter_obj = TransactionAmountFilter(cls.rule)
         
         # Create test transactions
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('50.00'),
-            name='Small Transaction',
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Medium Transaction',
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('200.00'),
-            name='Large Transaction',
-            currency='BRL'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('50.00'),
+                name='Small Transaction',
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('100.00'),
+                name='Medium Transaction',
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('200.00'),
+                name='Large Transaction',
+                currency='BRL'
+            ),
+        ])
     
     def test_type_property(self):
         """Test type property"""
         self.assertEqual(self.filter_obj.type, 'number')
     
-    def test_apply_greater_than(self):
-        """Test applying > operator"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '>', Decimal('100.00'))
-        
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().name, 'Large Transaction')
-    
-    def test_apply_greater_equal(self):
-        """Test applying >= operator"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '>=', Decimal('100.00'))
-        
-        self.assertEqual(result.count(), 2)  # 100 and 200
-    
-    def test_apply_less_than(self):
-        """Test applying < operator"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '<', Decimal('100.00'))
-        
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().name, 'Small Transaction')
-    
-    def test_apply_less_equal(self):
-        """Test applying <= operator"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '<=', Decimal('100.00'))
-        
-        self.assertEqual(result.count(), 2)  # 50 and 100
-    
-    def test_apply_equal(self):
-        """Test applying = operator"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '=', Decimal('100.00'))
-        
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().name, 'Medium Transaction')
+    def test_apply_comparison_operators(self):
+        """Test applying each comparison operator against 100.00"""
+        cases = [
+            ('>', {'Large Transaction'}),
+            ('>=', {'Medium Transaction', 'Large Transaction'}),
+            ('<', {'Small Transaction'}),
+            ('<=', {'Small Transaction', 'Medium Transaction'}),
+            ('=', {'Medium Transaction'}),
+        ]
+        for operator, expected_names in cases:
+            with self.subTest(operator=operator):
+                with self.assertNumQueries(1):
+                    rows = list(self.filter_obj.apply(self.queryset, operator, Decimal('100.00')))
+                
+                self.assertEqual({row.name for row in rows}, expected_names)
     
     def test_apply_with_string_value(self):
         """Test applying filter with string value converts to Decimal"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '=', '100.00')
+        with self.assertNumQueries(1):
+            rows = list(self.filter_obj.apply(self.queryset, '=', '100.00'))
         
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().name, 'Medium Transaction')
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].name, 'Medium Transaction')
     
     def test_apply_unsupported_operator(self):
         """Test applying unsupported operator raises ValueError"""
-        queryset = Transaction.objects.filter(account__user=self.user)
         with self.assertRaises(ValueError):
-            self.filter_obj.apply(queryset, 'like', Decimal('100.00'))
+            self.filter_obj.apply(self.queryset, 'like', Decimal('100.00'))
     
     def test_apply_no_matches(self):
         """Test applying filter with no matches"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '>', Decimal('1000.00'))
-        
-        self.assertEqual(result.count(), 0)
+        with self.assertNumQueries(1):
+            self.assertFalse(self.filter_obj.apply(self.queryset, '>', Decimal('1000.00')).exists())
 
 
-class TransactionMerchantFilterTestCase(TestCase):
+class TransactionMerchantFilterTestCase(RuleFilterTestCase):
     """Test TransactionMerchantFilter"""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.account = Account.objects.create(
-            user=self.user,
-            name='Test Account',
-            accountable_type='depository',
-            currency='BRL',
-            status='active'
-        )
-        self.merchant1 = Merchant.objects.create(
-            user=self.user,
-            name='Amazon',
-            color='#FF0000'
-        )
-        self.merchant2 = Merchant.objects.create(
-            user=self.user,
-            name='Uber',
-            color='#0000FF'
-        )
-        self.rule = Rule.objects.create(
-            user=self.user,
-            name='Test Rule',
-            resource_type='transaction',
-            effective_date=date.today()
-        )
-        self.filter_obj = TransactionMerchantFilter(self.rule)
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.merchant1, cls.merchant2 = Merchant.objects.bulk_create([
+            Merchant(
+                user=cls.user,
+                name='Amazon',
+                color='#FF0000'
+            ),
+            Merchant(
+                user=cls.user,
+                name='Uber',
+                color='#0000FF'
+            ),
+        ])
+        cls.filter_obj = TransactionMerchantFilter(cls.rule)
         
         # Create test transactions
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('100.00'),
-            name='Amazon Purchase',
-            merchant=self.merchant1,
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('200.00'),
-            name='Uber Ride',
-            merchant=self.merchant2,
-            currency='BRL'
-        )
-        Transaction.objects.create(
-            account=self.account,
-            date=date.today(),
-            amount=Decimal('300.00'),
-            name='No Merchant',
-            currency='BRL'
-        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('100.00'),
+                name='Amazon Purchase',
+                merchant=cls.merchant1,
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('200.00'),
+                name='Uber Ride',
+                merchant=cls.merchant2,
+                currency='BRL'
+            ),
+            Transaction(
+                account=cls.account,
+                date=date.today(),
+                amount=Decimal('300.00'),
+                name='No Merchant',
+                currency='BRL'
+            ),
+        ])
     
     def test_type_property(self):
         """Test type property"""
@@ -294,28 +236,31 @@ class TransactionMerchantFilterTestCase(TestCase):
         # Check format: [(name, id), ...]
         self.assertIsInstance(options[0], tuple)
         self.assertEqual(len(options[0]), 2)
+        self.assertEqual(
+            set(options),
+            {('Amazon', str(self.merchant1.id)), ('Uber', str(self.merchant2.id))}
+        )
     
     def test_apply_equal_operator(self):
         """Test applying = operator"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '=', str(self.merchant1.id))
+        with self.assertNumQueries(1):
+            rows = list(self.filter_obj.apply(self.queryset, '=', str(self.merchant1.id)))
         
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().merchant, self.merchant1)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].merchant_id, self.merchant1.id)
     
     def test_apply_equal_operator_merchant2(self):
         """Test applying = operator for second merchant"""
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '=', str(self.merchant2.id))
+        with self.assertNumQueries(1):
+            rows = list(self.filter_obj.apply(self.queryset, '=', str(self.merchant2.id)))
         
-        self.assertEqual(result.count(), 1)
-        self.assertEqual(result.first().merchant, self.merchant2)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].merchant_id, self.merchant2.id)
     
     def test_apply_unsupported_operator(self):
         """Test applying unsupported operator raises ValueError"""
-        queryset = Transaction.objects.filter(account__user=self.user)
         with self.assertRaises(ValueError):
-            self.filter_obj.apply(queryset, '>', str(self.merchant1.id))
+            self.filter_obj.apply(self.queryset, '>', str(self.merchant1.id))
     
     def test_apply_no_matches(self):
         """Test applying filter with no matches"""
@@ -331,8 +276,6 @@ class TransactionMerchantFilterTestCase(TestCase):
             color='#00FF00'
         )
         
-        queryset = Transaction.objects.filter(account__user=self.user)
-        result = self.filter_obj.apply(queryset, '=', str(other_merchant.id))
-        
-        self.assertEqual(result.count(), 0)
+        with self.assertNumQueries(1):
+            self.assertFalse(self.filter_obj.apply(self.queryset, '=', str(other_merchant.id)).exists())
 
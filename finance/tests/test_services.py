@@ -1,11 +1,15 @@
 """
 Comprehensive tests for finance services
 """
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import OperationalError
 from decimal import Decimal
 from datetime import date, timedelta
 from unittest.mock import patch, MagicMock
+from finance.checks import check_shared_cache
 from finance.models import (
     Account, Transaction, Balance, Valuation, Category
 )
@@ -14,6 +18,9 @@ from finance.services.balance_calculator import ForwardBalanceCalculator
 from finance.services.balance_materializer import BalanceMaterializer
 from finance.services.transfer_matcher import TransferMatcher
 from finance.services.installment_generator import InstallmentGenerator
+from finance.services.sync_circuit_breaker import SyncCircuitBreaker
+from finance.signals import mark_account_dirty
+from finance.tasks import DRAIN_LOCK_KEY, drain_dirty_accounts, retry_countdown, sync_account_balance
 
 User = get_user_model()
 
@@ -99,6 +106,29 @@ class AccountSyncerTestCase(TestCase):
         # Should have called the async task
         mock_delay.assert_called_once_with(self.account.id, strategy=None)
     
+    @patch('finance.services.account_syncer.group')
+    def test_sync_many_later_publishes_single_group(self, mock_group):
+        """Test sync_many_later enqueues one group instead of one task per account"""
+        other = Account.objects.create(
+            user=self.user,
+            name='Other Account',
+            accountable_type='depository',
+            currency='BRL',
+        )
+        AccountSyncer.sync_many_later([self.account.id, other.id], strategy='forward')
+        
+        mock_group.assert_called_once()
+        signatures = mock_group.call_args[0][0]
+        self.assertEqual([sig.args[0] for sig in signatures], [self.account.id, other.id])
+        self.assertEqual(signatures[0].kwargs, {'strategy': 'forward'})
+        mock_group.return_value.apply_async.assert_called_once_with()
+    
+    @patch('finance.services.account_syncer.group')
+    def test_sync_many_later_with_no_accounts(self, mock_group):
+        """Test sync_many_later does not publish anything for an empty list"""
+        self.assertIsNone(AccountSyncer.sync_many_later([]))
+        mock_group.assert_not_called()
+    
     def test_sync_with_valuation(self):
         """Test sync with valuation anchor"""
         Valuation.objects.create(
@@ -278,6 +308,50 @@ class BalanceCalculatorTestCase(TestCase):
         
         # Should handle credit card accounts
         self.assertIsInstance(balances, list)
+    
+    def test_opening_anchor_is_queried_once(self):
+        """Test the opening anchor valuation is memoized on the calculator"""
+        Valuation.objects.create(
+            account=self.account,
+            date=date.today() - timedelta(days=5),
+            amount=Decimal('1000.00'),
+            kind='reconciliation',
+            currency='BRL'
+        )
+        
+        calculator = ForwardBalanceCalculator(self.account)
+        with self.assertNumQueries(1):
+            anchor = calculator.get_opening_anchor()
+            self.assertEqual(calculator.get_opening_anchor_balance(), Decimal('1000.00'))
+            self.assertEqual(calculator.get_opening_anchor_date(), anchor.date)
+    
+    def test_calculate_query_count_does_not_grow_with_date_range(self):
+        """Test entries are loaded once for the whole range, not once per day"""
+        Valuation.objects.create(
+            account=self.account,
+            date=date.today() - timedelta(days=90),
+            amount=Decimal('1000.00'),
+            kind='reconciliation',
+            currency='BRL'
+        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                account=self.account,
+                date=date.today() - timedelta(days=days_ago),
+                amount=Decimal('10.00'),
+                name=f'Transaction {days_ago}',
+                currency='BRL'
+            )
+            for days_ago in (60, 30, 0)
+        ])
+        
+        calculator = ForwardBalanceCalculator(self.account)
+        # Opening anchor, three end-date lookups, then one load per entry/holding/valuation model
+        with self.assertNumQueries(8):
+            balances = calculator.calculate()
+        
+        self.assertEqual(len(balances), 91)
+        self.assertEqual(balances[-1].balance, Decimal('970.00'))
 
 
 class TransferMatcherTestCase(TestCase):
@@ -382,6 +456,83 @@ class TransferMatcherTestCase(TestCase):
         # Should not create duplicate
         self.assertEqual(count, 0)
     
+    def test_candidate_search_does_not_query_per_pair(self):
+        """Test the candidate search and transaction loads stay constant as pairs grow"""
+        for i in range(3):
+            Transaction.objects.bulk_create([
+                Transaction(
+                    account=self.account1,
+                    date=date.today() - timedelta(days=i),
+                    amount=Decimal('100.00') + i,
+                    name=f'Transfer Out {i}',
+                    currency='BRL',
+                    kind='standard'
+                ),
+                Transaction(
+                    account=self.account2,
+                    date=date.today() - timedelta(days=i),
+                    amount=-(Decimal('100.00') + i),
+                    name=f'Transfer In {i}',
+                    currency='BRL',
+                    kind='standard'
+                ),
+            ])
+        
+        matcher = TransferMatcher(self.user)
+        # Accounts, inflows, outflows, candidate transactions, then per transfer
+        # one INSERT and two kind UPDATEs inside the atomic block's savepoint
+        with self.assertNumQueries(4 + 2 + 3 * 3):
+            count = matcher.auto_match_transfers()
+        
+        self.assertEqual(count, 3)
+        self.assertEqual(
+            Transaction.objects.filter(account__user=self.user, kind='funds_movement').count(),
+            6
+        )
+    
+    def test_cross_currency_match_takes_earliest_outflow_in_window(self):
+        """Test other-currency outflows are matched in date order, only inside the window"""
+        from finance.models import ExchangeRate
+        
+        usd_account = Account.objects.create(
+            user=self.user,
+            name='USD Account',
+            accountable_type='depository',
+            currency='USD',
+            status='active'
+        )
+        today = date.today()
+        for days_ago in (10, 3, 1):
+            ExchangeRate.objects.create(
+                from_currency='USD',
+                to_currency='BRL',
+                rate=Decimal('5.00'),
+                date=today - timedelta(days=days_ago)
+            )
+        outflows = Transaction.objects.bulk_create([
+            Transaction(
+                account=usd_account,
+                date=today - timedelta(days=days_ago),
+                amount=Decimal('100.00'),
+                name=f'USD Out {days_ago}',
+                currency='USD',
+                kind='standard'
+            )
+            for days_ago in (10, 3, 1)
+        ])
+        inflow = Transaction.objects.create(
+            account=self.account1,
+            date=today,
+            amount=Decimal('-500.00'),
+            name='BRL In',
+            currency='BRL',
+            kind='standard'
+        )
+        
+        candidates = TransferMatcher(self.user)._find_match_candidates()
+        
+        self.assertEqual(candidates, [(str(inflow.id), str(outflows[1].id))])
+    
     def test_match_credit_card_payment(self):
         """Test matching credit card payment transfer"""
         # Skip - requires negative amounts which model prevents
@@ -621,3 +772,373 @@ class BalanceMaterializerTestCase(TestCase):
         # Account balance should be updated
         self.assertIsNotNone(self.account.balance)
 
+
+
+@override_settings(DEFER_ACCOUNT_SYNC=True)
+class EntryChangeSyncSignalTestCase(TestCase):
+    """Test that entry changes flag accounts for the periodic sync drain"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        # Flush the fixture's own invalidation so tests start with nothing pending
+        with self.captureOnCommitCallbacks(execute=True):
+            self.account = Account.objects.create(
+                user=self.user,
+                name='Test Account',
+                accountable_type='depository',
+                currency='BRL',
+                status='active'
+            )
+    
+    def needs_sync(self):
+        return Account.objects.values_list('needs_sync', flat=True).get(pk=self.account.id)
+    
+    def test_entry_changes_mark_account_dirty(self):
+        """Test entry changes flag the account on commit instead of syncing inline"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Transaction.objects.create(
+                    account=self.account,
+                    date=date.today(),
+                    amount=Decimal('10.00'),
+                    name=f'Transaction {i}',
+                    currency='BRL'
+                )
+            self.assertFalse(self.needs_sync())
+        
+        self.assertTrue(self.needs_sync())
+        self.assertFalse(Balance.objects.filter(account=self.account).exists())
+    
+    def test_deleting_future_valuation_skips_sync(self):
+        """Test deleting a future non-anchor valuation past all entries does not flag the account"""
+        valuation = Valuation.objects.create(
+            account=self.account,
+            date=date.today() + timedelta(days=30),
+            amount=Decimal('500.00'),
+            kind='current_anchor',
+            currency='BRL'
+        )
+        Account.objects.filter(pk=self.account.id).update(needs_sync=False)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            valuation.delete()
+        
+        self.assertFalse(self.needs_sync())
+    
+    def test_deleting_past_valuation_flags_account(self):
+        """Test deleting a valuation inside the balance range still flags the account"""
+        valuation = Valuation.objects.create(
+            account=self.account,
+            date=date.today() - timedelta(days=5),
+            amount=Decimal('500.00'),
+            kind='current_anchor',
+            currency='BRL'
+        )
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            valuation.delete()
+        
+        self.assertTrue(self.needs_sync())
+    
+    def test_partial_update_of_non_balance_fields_skips_sync(self):
+        """Test save(update_fields=...) without balance fields does not flag the account"""
+        txn = Transaction.objects.create(
+            account=self.account,
+            date=date.today(),
+            amount=Decimal('10.00'),
+            name='Groceries',
+            currency='BRL'
+        )
+        Account.objects.filter(pk=self.account.id).update(needs_sync=False)
+        
+        txn.notes = 'Weekly shopping'
+        with self.captureOnCommitCallbacks(execute=True):
+            txn.save(update_fields=['notes'])
+        
+        self.assertFalse(self.needs_sync())
+    
+    def test_partial_update_of_balance_fields_flags_account(self):
+        """Test save(update_fields=...) touching amount still flags the account"""
+        txn = Transaction.objects.create(
+            account=self.account,
+            date=date.today(),
+            amount=Decimal('10.00'),
+            name='Groceries',
+            currency='BRL'
+        )
+        Account.objects.filter(pk=self.account.id).update(needs_sync=False)
+        
+        txn.amount = Decimal('15.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            txn.save(update_fields=['amount', 'notes'])
+        
+        self.assertTrue(self.needs_sync())
+    
+    def test_partial_update_by_attname_flags_account(self):
+        """Test save(update_fields=['account_id']) is treated as an account change"""
+        txn = Transaction.objects.create(
+            account=self.account,
+            date=date.today(),
+            amount=Decimal('10.00'),
+            name='Groceries',
+            currency='BRL'
+        )
+        Account.objects.filter(pk=self.account.id).update(needs_sync=False)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            txn.save(update_fields=['account_id'])
+        
+        self.assertTrue(self.needs_sync())
+    
+    def test_drain_syncs_each_dirty_account_once(self):
+        """Test the periodic drain syncs flagged accounts and clears the flag"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Transaction.objects.create(
+                    account=self.account,
+                    date=date.today(),
+                    amount=Decimal('10.00'),
+                    name=f'Transaction {i}',
+                    currency='BRL'
+                )
+        
+        result = drain_dirty_accounts.apply()
+        
+        self.assertEqual(result.result, 'Synced 1 dirty accounts')
+        self.assertTrue(Balance.objects.filter(account=self.account).exists())
+        self.assertFalse(self.needs_sync())
+        self.assertEqual(drain_dirty_accounts.apply().result, 'Synced 0 dirty accounts')
+    
+    @patch('finance.tasks.AccountSyncer.sync')
+    def test_drain_loads_dirty_accounts_in_one_query(self, mock_sync):
+        """Test the drain fetches all flagged accounts together rather than one by one"""
+        other_account = Account.objects.create(
+            user=self.user,
+            name='Other Account',
+            accountable_type='depository',
+            currency='BRL',
+            status='active'
+        )
+        mark_account_dirty(self.account.id)
+        mark_account_dirty(other_account.id)
+        
+        # One query lists flagged ids, one loads the accounts, one clears the flags
+        with self.assertNumQueries(3):
+            result = drain_dirty_accounts.apply()
+        
+        self.assertEqual(result.result, 'Synced 2 dirty accounts')
+        self.assertEqual(mock_sync.call_count, 2)
+    
+    def test_balance_materialization_keeps_sync_flag(self):
+        """Test writing the account balance does not clear a pending sync flag"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                account=self.account,
+                date=date.today(),
+                amount=Decimal('10.00'),
+                name='Transaction',
+                currency='BRL'
+            )
+        
+        AccountSyncer(self.account).sync()
+        
+        self.assertTrue(self.needs_sync())
+        self.assertTrue(Balance.objects.filter(account=self.account).exists())
+    
+    @patch('finance.tasks.AccountSyncer.sync')
+    def test_drain_skips_while_another_run_holds_the_lock(self, mock_sync):
+        """Test an overlapping drain leaves flagged accounts to the running one"""
+        mark_account_dirty(self.account.id)
+        cache.add(DRAIN_LOCK_KEY, 1)
+        
+        result = drain_dirty_accounts.apply()
+        
+        self.assertEqual(result.result, 'Drain already running')
+        mock_sync.assert_not_called()
+        self.assertTrue(self.needs_sync())
+        
+        cache.delete(DRAIN_LOCK_KEY)
+        self.assertEqual(drain_dirty_accounts.apply().result, 'Synced 1 dirty accounts')
+    
+    @override_settings(DEFER_ACCOUNT_SYNC=False)
+    def test_entry_changes_sync_inline_without_beat(self):
+        """Test accounts are synced on commit when syncs are not deferred to Beat"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                account=self.account,
+                date=date.today(),
+                amount=Decimal('10.00'),
+                name='Transaction',
+                currency='BRL'
+            )
+        
+        self.assertFalse(self.needs_sync())
+        self.assertTrue(Balance.objects.filter(account=self.account).exists())
+    
+    @patch('finance.tasks.AccountSyncer.sync', side_effect=OperationalError('database is locked'))
+    def test_drain_keeps_failed_accounts_dirty(self, mock_sync):
+        """Test a failed sync leaves the account flagged for the next drain"""
+        mark_account_dirty(self.account.id)
+        
+        with self.assertLogs('finance.tasks', level='ERROR'):
+            drain_dirty_accounts.apply()
+        
+        self.assertTrue(self.needs_sync())
+    
+    def test_entry_change_invalidates_dashboard_cache(self):
+        """Test every dashboard period cache key is cleared on entry change"""
+        cache.set_many({f'dashboard_stats:{self.user.id}:{p}': 'stale' for p in ('1Y', 'YTD', 'ALL')})
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                account=self.account,
+                date=date.today(),
+                amount=Decimal('10.00'),
+                name='Transaction',
+                currency='BRL'
+            )
+            # Nothing is cleared before the transaction commits
+            self.assertEqual(cache.get(f'dashboard_stats:{self.user.id}:1Y'), 'stale')
+        
+        for period in ('1Y', 'YTD', 'ALL'):
+            self.assertIsNone(cache.get(f'dashboard_stats:{self.user.id}:{period}'))
+    
+    @patch('finance.signals.invalidate_dashboard_cache')
+    def test_invalidation_is_coalesced_per_transaction(self, mock_invalidate):
+        """Test many entry changes in one transaction invalidate the cache once"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Transaction.objects.create(
+                    account=self.account,
+                    date=date.today(),
+                    amount=Decimal('10.00'),
+                    name=f'Transaction {i}',
+                    currency='BRL'
+                )
+        
+        mock_invalidate.assert_called_once_with(self.user.id)
+
+
+class SyncAccountBalanceTaskTestCase(TestCase):
+    """Test sync_account_balance retry behaviour"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Test Account',
+            accountable_type='depository',
+            currency='BRL',
+            status='active'
+        )
+    
+    def test_retry_countdown_backs_off_with_jitter(self):
+        """Test retry delays grow exponentially, are capped and jittered"""
+        for retries, base in [(0, 300), (1, 600), (2, 1200), (10, 3600)]:
+            countdown = retry_countdown(retries)
+            self.assertGreaterEqual(countdown, base * 0.9)
+            self.assertLessEqual(countdown, base * 1.1)
+    
+    @patch('finance.tasks.AccountSyncer.sync', side_effect=OperationalError('database is locked'))
+    def test_transient_error_is_retried(self, mock_sync):
+        """Test database errors consume the retry budget"""
+        with self.assertLogs('finance.tasks', level='ERROR'):
+            result = sync_account_balance.apply(args=(str(self.account.id),))
+        
+        self.assertIsInstance(result.result, OperationalError)
+        self.assertEqual(mock_sync.call_count, 4)
+    
+    @patch('finance.tasks.AccountSyncer.sync', side_effect=ValidationError('bad data'))
+    def test_permanent_error_is_not_retried(self, mock_sync):
+        """Test validation errors fail fast without retrying"""
+        with self.assertLogs('finance.tasks', level='ERROR'):
+            result = sync_account_balance.apply(args=(str(self.account.id),))
+        
+        self.assertTrue(result.successful())
+        self.assertEqual(mock_sync.call_count, 1)
+    
+    def test_missing_account_is_not_retried(self):
+        """Test a deleted account returns immediately"""
+        result = sync_account_balance.apply(args=('00000000-0000-0000-0000-000000000000',))
+        
+        self.assertIn('not found', result.result)
+    
+    @patch('finance.tasks.AccountSyncer.sync')
+    def test_open_circuit_breaker_skips_sync(self, mock_sync):
+        """Test the task short-circuits while the account's breaker is open"""
+        breaker = SyncCircuitBreaker(str(self.account.id))
+        for _ in range(SyncCircuitBreaker.FAILURE_THRESHOLD):
+            breaker.record_failure()
+        
+        result = sync_account_balance.apply(args=(str(self.account.id),))
+        
+        self.assertIn('circuit breaker open', result.result)
+        mock_sync.assert_not_called()
+
+
+class SyncCircuitBreakerTestCase(TestCase):
+    """Test SyncCircuitBreaker state transitions"""
+    
+    def setUp(self):
+        cache.clear()
+        self.breaker = SyncCircuitBreaker('account-id')
+    
+    def test_opens_after_threshold_failures(self):
+        """Test the breaker stays closed below the threshold and opens at it"""
+        for _ in range(SyncCircuitBreaker.FAILURE_THRESHOLD - 1):
+            self.breaker.record_failure()
+        self.assertFalse(self.breaker.is_open())
+        
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.is_open())
+    
+    def test_allows_trial_call_after_cooldown(self):
+        """Test the breaker lets calls through once the cooldown has passed"""
+        with patch('finance.services.sync_circuit_breaker.time.time', return_value=1000.0):
+            for _ in range(SyncCircuitBreaker.FAILURE_THRESHOLD):
+                self.breaker.record_failure()
+        
+        with patch('finance.services.sync_circuit_breaker.time.time',
+                   return_value=1000.0 + SyncCircuitBreaker.COOLDOWN_SECONDS):
+            self.assertFalse(self.breaker.is_open())
+    
+    def test_success_closes_breaker(self):
+        """Test a successful sync resets the failure count"""
+        for _ in range(SyncCircuitBreaker.FAILURE_THRESHOLD):
+            self.breaker.record_failure()
+        
+        self.breaker.record_success()
+        
+        self.assertFalse(self.breaker.is_open())
+    
+    def test_failures_from_separate_breakers_accumulate(self):
+        """Test failures recorded by different breaker instances share one count"""
+        for _ in range(SyncCircuitBreaker.FAILURE_THRESHOLD):
+            SyncCircuitBreaker('account-id').record_failure()
+        
+        self.assertTrue(self.breaker.is_open())
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_deploy_check_warns_about_process_local_cache(self):
+        """Test the deploy check flags a cache the worker processes cannot share"""
+        warnings = check_shared_cache(None)
+        
+        self.assertEqual([w.id for w in warnings], ['finance.W001'])
+    
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+    }})
+    def test_deploy_check_accepts_shared_cache(self):
+        """Test the deploy check passes with a cross-process cache backend"""
+        self.assertEqual(check_shared_cache(None), [])
@@ -4,7 +4,8 @@ Unit tests for finance utils
 from django.test import TestCase
 from django.http import HttpResponse
 import json
-from finance.utils import add_htmx_trigger, add_toast_trigger
+from decimal import Decimal
+from finance.utils import add_htmx_trigger, add_toast_trigger, parse_brazilian_currency
 
 
 class FinanceUtilsTestCase(TestCase):
@@ -89,4 +90,24 @@ class FinanceUtilsTestCase(TestCase):
         trigger_data = json.loads(response['HX-Trigger'])
         toast_data = trigger_data['show-toast']
         self.assertEqual(toast_data['type'], 'success')
-
+    
+    def test_parse_brazilian_currency_reuses_cached_result(self):
+        """Test repeated short amounts are served from the parse cache"""
+        first = parse_brazilian_currency('R$ 1.234,56')
+        second = parse_brazilian_currency('R$ 1.234,56')
+        
+        self.assertEqual(first, Decimal('1234.56'))
+        self.assertIs(first, second)
+    
+    def test_parse_brazilian_currency_long_input(self):
+        """Test strings past the cache length limit still parse correctly"""
+        value = 'R$ 1' + '.000' * 8 + ',99'
+        
+        self.assertGreater(len(value), 32)
+        self.assertEqual(parse_brazilian_currency(value), Decimal('1000000000000000000000000.99'))
+    
+    def test_parse_brazilian_currency_invalid(self):
+        """Test invalid amounts raise ValueError on every call, not just the first"""
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                parse_brazilian_currency('invalid')
@@ -3,8 +3,12 @@ Utility functions for finance views
 """
 import json
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from django.http import HttpResponse
 
+# Currency strings longer than this are parsed without caching, bounding the cache's memory
+_PARSE_CACHE_MAX_LENGTH = 32
+
 
 def add_htmx_trigger(response, event_name, data=None):
     """
@@ -75,8 +79,18 @@ def parse_brazilian_currency(value):
     if not value:
         raise ValueError("Empty value cannot be parsed")
     
+    amount_str = str(value)
+    # Form input repeats a small set of short amounts; longer strings skip the cache
+    if len(amount_str) <= _PARSE_CACHE_MAX_LENGTH:
+        return _parse_amount(amount_str)
+    return _parse_amount.__wrapped__(amount_str)
+
+
+@lru_cache(maxsize=1024)
+def _parse_amount(value: str) -> Decimal:
+    """Parse a Brazilian currency string; Decimal is immutable, so results are safe to share"""
     # Remove currency symbol and whitespace
-    amount_str = str(value).replace('R$', '').strip()
+    amount_str = value.replace('R$', '').strip()
     
     # Remove thousand separators (dots) first
     amount_str = amount_str.replace('.', '')
@@ -88,4 +102,3 @@ def parse_brazilian_currency(value):
         return Decimal(amount_str)
     except (ValueError, InvalidOperation) as e:
         raise ValueError(f"Invalid currency format: {value}") from e
-
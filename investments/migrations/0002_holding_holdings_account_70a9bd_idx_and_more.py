@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_alter_rulecondition_operator_and_more'),
+        ('investments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='holding',
+            index=models.Index(fields=['account', 'date'], name='holdings_account_70a9bd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['account', 'date'], name='trades_account_6a1e79_idx'),
+        ),
+    ]
@@ -83,6 +83,7 @@ class Holding(models.Model):
         unique_together = [['account', 'security', 'date', 'currency']]
         indexes = [
             models.Index(fields=['account', 'security', 'date']),
+            models.Index(fields=['account', 'date']),
         ]
         ordering = ['-date']
     
@@ -115,6 +116,7 @@ class Trade(models.Model):
         db_table = 'trades'
         indexes = [
             models.Index(fields=['account', 'security', 'date']),
+            models.Index(fields=['account', 'date']),
         ]
         ordering = ['-date']
     
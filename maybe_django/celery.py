@@ -21,5 +21,13 @@ app.conf.beat_schedule = {
             'expires': 3600,  # Task expires after 1 hour if not executed
         }
     },
+    # Only does work with DEFER_ACCOUNT_SYNC=True; runs never overlap (see the task's lock)
+    'drain-dirty-accounts': {
+        'task': 'finance.tasks.drain_dirty_accounts',
+        'schedule': 10.0,  # Sync accounts with changed entries every 10 seconds
+        'options': {
+            'expires': 10,  # Skip stale runs; the next one covers the same accounts
+        }
+    },
 }
 
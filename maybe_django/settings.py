@@ -115,6 +115,26 @@ else:
     }
 
 
+# Cache
+# Sync circuit breakers and dashboard invalidations are shared between the web,
+# worker and beat processes, so deployments must point REDIS_URL at a shared Redis.
+# Without it (tests, single-process development) each process gets its own LocMemCache.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL and 'test' not in sys.argv and 'pytest' not in sys.argv:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Custom User Model
 AUTH_USER_MODEL = 'core.User'
 
@@ -141,6 +161,12 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PBKDF2 is deliberately slow; tests create many users, so use a fast hasher there
+if 'test' in sys.argv or 'pytest' in sys.argv:
+    PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/ref/settings/#internationalization
@@ -192,4 +218,14 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Acknowledge after the task finishes so a crashed worker's sync is redelivered
+CELERY_TASK_ACKS_LATE = True
+
+# Defer account syncs to the drain_dirty_accounts Beat task instead of syncing on commit.
+# Only enable this when a Celery worker and Beat are running, or balances stop updating.
+DEFER_ACCOUNT_SYNC = os.environ.get('DEFER_ACCOUNT_SYNC', 'False') == 'True'
+
+# Run tasks inline during tests so no broker is needed
+if 'test' in sys.argv or 'pytest' in sys.argv:
+    CELERY_TASK_ALWAYS_EAGER = True
 